@@ -0,0 +1,210 @@
+/*********************************************
+ * OPL 22.1.2.0 Model
+ * Author: siwirus
+ * Creation Date: Jun 18, 2025 at 12:17:00 AM
+ *
+ * Sparse variant of model.mod. x only exists for the feasible
+ * (trick, position, player, card) plays listed in the data file (from
+ * json_to_opl_dat.generate_sparse_opl_dat), and the seat at each position
+ * follows from who leads the trick, which is the previous trick's winner.
+ *********************************************/
+
+// Parameters from data file
+string declarer = ...;
+string trump = ...;
+int contract_level = ...;
+string lead_card = ...;
+string lead_player = ...;
+
+// Define sets
+{string} PLAYERS = {"W", "N", "E", "S"};
+{string} SUITS = {"S", "H", "D", "C"};
+{string} RANKS = {"2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"};
+
+// Player partnerships
+string PARTNER[p in PLAYERS] =
+  p == "N" ? "S" :
+  p == "S" ? "N" :
+  p == "E" ? "W" :
+  p == "W" ? "E" : "";
+
+// Rank values for comparison
+int RANK_VALUE[r in RANKS] =
+  r == "2" ? 2 : r == "3" ? 3 : r == "4" ? 4 : r == "5" ? 5 : r == "6" ? 6 :
+  r == "7" ? 7 : r == "8" ? 8 : r == "9" ? 9 : r == "T" ? 10 : r == "J" ? 11 :
+  r == "Q" ? 12 : r == "K" ? 13 : 14;
+
+// Card hands for each player (from data file)
+{string} hand[PLAYERS] = ...;
+
+// Derive all cards in play
+{string} ALL_CARDS = union(p in PLAYERS) hand[p];
+
+string card_suit[ALL_CARDS];
+string card_rank[ALL_CARDS];
+int card_rank_value[ALL_CARDS];
+
+// Fill arrays
+execute {
+  for(var c in ALL_CARDS) {
+    card_suit[c] = c.substring(0,1);
+    card_rank[c] = c.substring(1); // From position 1 to end
+    card_rank_value[c] = RANK_VALUE[card_rank[c]];
+  }
+}
+
+int SUIT_LENGTH[p in PLAYERS][s in SUITS] = sum(c in hand[p]: card_suit[c] == s) 1;
+
+// Seats clockwise from q to p: p plays at position SEAT_OFFSET[p][q] + 1 when q leads
+int SEAT_OFFSET[p in PLAYERS][q in PLAYERS] = (ord(PLAYERS, p) - ord(PLAYERS, q) + 4) % 4;
+
+// Number of tricks to play
+int NUM_TRICKS = 13;
+range TRICKS = 1..NUM_TRICKS;
+range POSITIONS = 1..4;  // 4 positions per trick
+
+// Feasible plays, possible trick winners and plays fixed by the opening lead
+tuple Play { int trick; int position; string player; string card; }
+tuple TrickCard { int trick; string card; }
+{Play} PLAYS = ...;
+{TrickCard} WINNERS = ...;
+{Play} FIXED = ...;
+
+// Decision Variables
+// x[<t,pos,p,c>] = 1 if player p plays card c at position pos in trick t
+dvar boolean x[PLAYS];
+dvar boolean leads[TRICKS][PLAYERS];
+
+// Auxiliary variables for trick winners
+dvar boolean trick_won_by_declarer[TRICKS];
+dvar boolean card_wins_trick[WINNERS];
+
+// Variables for tracking leading suit in each trick
+dvar boolean suit_led[TRICKS][SUITS];
+
+// Objective: Maximize declarer tricks
+maximize sum(t in TRICKS) trick_won_by_declarer[t];
+
+subject to {
+
+  // Each card is played exactly once
+  forall(p in PLAYERS, c in hand[p])
+    sum(pl in PLAYS: pl.player == p && pl.card == c) x[pl] == 1;
+
+  // Each player plays exactly one card per trick, at the position given by the leader
+  forall(t in TRICKS, p in PLAYERS, pos in POSITIONS)
+    sum(pl in PLAYS: pl.trick == t && pl.player == p && pl.position == pos) x[pl] ==
+      sum(q in PLAYERS: SEAT_OFFSET[p][q] == pos - 1) leads[t][q];
+
+  // One leader per trick: the opening leader, then the previous trick's winner
+  forall(t in TRICKS)
+    sum(p in PLAYERS) leads[t][p] == 1;
+  leads[1][lead_player] == 1;
+  forall(t in TRICKS: t < NUM_TRICKS, p in PLAYERS)
+    leads[t + 1][p] == sum(w in WINNERS: w.trick == t && w.card in hand[p]) card_wins_trick[w];
+
+  // Opening lead and other plays fixed by preprocessing
+  forall(pl in FIXED)
+    x[pl] == 1;
+
+  // The led suit is determined by the card played at position 1
+  forall(t in TRICKS, s in SUITS)
+    suit_led[t][s] == sum(pl in PLAYS: pl.trick == t && pl.position == 1 && card_suit[pl.card] == s) x[pl];
+
+  // Follow suit: if s is led and p still holds a card of s, p plays s
+  forall(t in TRICKS, p in PLAYERS, s in SUITS: SUIT_LENGTH[p][s] >= 1)
+    SUIT_LENGTH[p][s]
+      - sum(pl in PLAYS: pl.player == p && pl.trick < t && card_suit[pl.card] == s) x[pl]
+      - SUIT_LENGTH[p][s] * (1 - suit_led[t][s])
+    <= SUIT_LENGTH[p][s] * sum(pl in PLAYS: pl.player == p && pl.trick == t && card_suit[pl.card] == s) x[pl];
+
+  // A card can only win if it's played
+  forall(w in WINNERS)
+    card_wins_trick[w] <= sum(pl in PLAYS: pl.trick == w.trick && pl.card == w.card) x[pl];
+
+  // A trump wins only if no higher trump is played
+  forall(w in WINNERS: trump != "NT" && card_suit[w.card] == trump)
+    4 * card_wins_trick[w] <= 4 - sum(pl in PLAYS: pl.trick == w.trick && card_suit[pl.card] == trump &&
+                                      card_rank_value[pl.card] > card_rank_value[w.card]) x[pl];
+
+  // Other cards win only in the led suit, with no higher card of it and no trump played
+  forall(w in WINNERS: trump == "NT" || card_suit[w.card] != trump) {
+    card_wins_trick[w] <= suit_led[w.trick][card_suit[w.card]];
+
+    4 * card_wins_trick[w] <= 4 - sum(pl in PLAYS: pl.trick == w.trick && card_suit[pl.card] == card_suit[w.card] &&
+                                      card_rank_value[pl.card] > card_rank_value[w.card]) x[pl];
+
+    if (trump != "NT") {
+      4 * card_wins_trick[w] <= 4 - sum(pl in PLAYS: pl.trick == w.trick && card_suit[pl.card] == trump) x[pl];
+    }
+  }
+
+  // Exactly one card wins each trick
+  forall(t in TRICKS)
+    sum(w in WINNERS: w.trick == t) card_wins_trick[w] == 1;
+
+  // Declarer wins trick if declarer or partner's card wins
+  forall(t in TRICKS)
+    trick_won_by_declarer[t] ==
+      sum(w in WINNERS: w.trick == t && (w.card in hand[declarer] || w.card in hand[PARTNER[declarer]]))
+        card_wins_trick[w];
+}
+
+// Post-processing: Calculate results
+execute {
+  var needed_tricks = 6 + contract_level;
+  var declarer_tricks_won = 0;
+
+  for(var t in TRICKS) {
+    if(trick_won_by_declarer[t] == 1) {
+      declarer_tricks_won++;
+    }
+  }
+
+  writeln("==================");
+  writeln("         CPLEX BRIDGE SOLVER RESULTS");
+  writeln("===================");
+  writeln("Contract: " + contract_level + trump + " by " + declarer);
+  writeln("Opening lead: " + lead_card + " by " + lead_player);
+  writeln("Needed tricks: " + needed_tricks);
+  writeln("Declarer tricks: " + declarer_tricks_won);
+  writeln();
+
+  // Show detailed trick analysis
+  writeln("Trick-by-trick analysis:");
+  writeln("-----------------------------");
+
+  for(var t in TRICKS) {
+    write("Trick " + t + ": ");
+
+    for(var pos in POSITIONS) {
+      for(var pl in PLAYS) {
+        if(pl.trick == t && pl.position == pos && x[pl] == 1) {
+          write(pl.player + ":" + pl.card + " ");
+        }
+      }
+    }
+
+    if(trick_won_by_declarer[t] == 1) {
+      writeln("(Declarer side wins)");
+    } else {
+      writeln("(Defense wins)");
+    }
+  }
+
+  writeln("-----------------");
+
+  if(declarer_tricks_won >= needed_tricks) {
+    var overtricks = declarer_tricks_won - needed_tricks;
+    writeln("✅ CONTRACT MADE!");
+    if(overtricks > 0) {
+      writeln("   +" + overtricks + " overtricks!");
+    }
+  } else {
+    var undertricks = needed_tricks - declarer_tricks_won;
+    writeln("❌ CONTRACT FAILED!");
+    writeln("   Down " + undertricks + " tricks");
+  }
+
+  writeln("=====================");
+}
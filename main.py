@@ -2,9 +2,18 @@ import time
 import copy
 from src.Game_Engine import GameState, load_deal
 from src.simulation import simulate_game
-from src.declarer import genetic_algorithm
+from src.declarer import genetic_algorithm, DeclarerStrategy
+from src.result_store import ResultStore, restore_state, solver_config
+from src.genome_library import GenomeLibrary
+from src.evaluation import SerialEvaluator, ThreadPoolEvaluator
+from src.shared_buffers import SharedMemoryEvaluator
+from src.instrumentation import profiled
+from src.endgame import EndgameTable
+from src.surrogate import RidgeSurrogate
 
 
+import argparse
+import contextlib
 import csv
 import os
 
@@ -37,12 +46,14 @@ def save_results_to_csv(filename, deal_file, declarer, contract_level, trump, op
 def show_detailed_results(state, declarer, contract_level, best_strategy):
     """Display detailed results matching OPL solver format"""
     partnerships = {"N": "S", "S": "N", "E": "W", "W": "E"}
+    # Lean games keep only the play array
+    trick_history = state.trick_history or state.rebuild_trick_history()
 
     print("=" * 60)
     print("      GENETIC ALGORITHM BRIDGE SOLVER RESULTS")
     print("=" * 60)
     print(f"Contract: {contract_level}{state.trump} by {declarer}")
-    print(f"Opening lead: {state.trick_history[0]['cards'][0][1]} by {state.trick_history[0]['cards'][0][0]}")
+    print(f"Opening lead: {trick_history[0]['cards'][0][1]} by {trick_history[0]['cards'][0][0]}")
     print(f"Needed tricks: {6 + contract_level}")
     print(f"Declarer tricks: {state.declarer_tricks}")
     print()
@@ -51,7 +62,7 @@ def show_detailed_results(state, declarer, contract_level, best_strategy):
     print("Trick-by-trick analysis:")
     print("-" * 40)
 
-    for trick in state.trick_history:
+    for trick in trick_history:
         trick_num = trick['trick_num']
         winner = trick['winner']
         cards = trick['cards']
@@ -86,10 +97,33 @@ def show_detailed_results(state, declarer, contract_level, best_strategy):
     print(f"Genome diversity: {len(set(round(g, 2) for g in best_strategy.genome[:20]))}/20 (first 20 genes)")
 
 
-def main(deal_file,p,g):
+def show_cached_result(deal, cached):
+    """Display a stored result without solving the deal again"""
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+
+    best_strategy = DeclarerStrategy(genome=cached['genome'])
+    best_strategy.fitness = cached['fitness']
+
+    print(f"Cached result found (originally solved in {cached['runtime']:.1f} seconds)\n")
+    show_detailed_results(restore_state(deal, cached), declarer, contract_level, best_strategy)
+
+
+def main(deal_file,p,g,store=None,library=None,evaluator=None,*,telemetry_dir=None,endgame=None,
+         single_dummy=0,surrogate=False,optimizer='ga',low_fidelity=0):
     """Main function to run the genetic algorithm bridge solver"""
     # Load deal
-    hands, declarer, trump, contract_level, lead_card, lead_player = load_deal(deal_file)
+    deal = load_deal(deal_file)
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+    config = solver_config(p, g, warm_start=library is not None, endgame=endgame, single_dummy=single_dummy,
+                           surrogate=surrogate, optimizer=optimizer, low_fidelity=low_fidelity)
+
+    # Look the deal up before doing any work
+    if store is not None:
+        cached = store.get(deal, config)
+        if cached is not None:
+            print(f"Contract: {contract_level}{trump} by {declarer}")
+            show_cached_result(deal, cached)
+            return
 
     print("=" * 60)
     print("        GENETIC ALGORITHM BRIDGE SOLVER")
@@ -101,15 +135,33 @@ def main(deal_file,p,g):
 
     # Show hands
     print("Hands:")
-    for p in "NESW":
-        cards_display = sorted(hands[p], key=lambda c: (c.suit_value, c.rank_value))
-        print(f"{p}: {cards_display}")
+    for player in "NESW":
+        cards_display = sorted(hands[player], key=lambda c: (c.suit_value, c.rank_value))
+        print(f"{player}: {cards_display}")
     print()
 
+    # Seed a quarter of the population from similar deals solved before
+    seed_genomes = library.nearest(deal, k=p // 4) if library is not None else None
+    if seed_genomes:
+        print(f"Warm start: {len(seed_genomes)} genomes from the library\n")
+
+    telemetry = None
+    if telemetry_dir is not None:
+        os.makedirs(telemetry_dir, exist_ok=True)
+        telemetry = os.path.join(telemetry_dir, os.path.basename(deal_file).replace('.json', '.jsonl'))
+
     # Run genetic algorithm
+    run = None
+    if optimizer != 'ga':
+        # NumPy is only needed for the alternative optimizers
+        from src.optimizers import OPTIMIZERS
+        run = OPTIMIZERS[optimizer]
     start_time = time.time()
     best_strategy = genetic_algorithm(hands, declarer, trump, contract_level, lead_card, lead_player,
-                      population_size=p, generations=g)
+                      population_size=p, generations=g, initial_genomes=seed_genomes,
+                      evaluator=evaluator, telemetry=telemetry, endgame=endgame,
+                      single_dummy=single_dummy, surrogate=RidgeSurrogate() if surrogate else None,
+                      optimizer=run, low_fidelity=low_fidelity)
     end_time = time.time()
 
     print(f"\nOptimization completed in {end_time - start_time:.1f} seconds")
@@ -146,12 +198,63 @@ def main(deal_file,p,g):
         runtime=end_time - start_time
     )
 
+    if store is not None:
+        store.put(deal, config, best_strategy, final_state.declarer_tricks,
+                  end_time - start_time, final_state.trick_history)
+    if library is not None:
+        library.add(deal, best_strategy)
+
 
 
 if __name__ == "__main__":
-    for deal_file in os.listdir('utils/deals'):
-        if deal_file.endswith('.json'):
-            deal_path = os.path.join('utils/deals', deal_file)
-            print(f"Processing deal: {deal_file}")
-            main(deal_path,40,70)
-            print("=" * 60)
+    parser = argparse.ArgumentParser(description="Solve every deal in utils/deals with the genetic algorithm")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes evaluating the population (1 = in this process)")
+    parser.add_argument('--threads', action='store_true',
+                        help="use a thread pool instead of processes (free-threaded CPython)")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="instrument the run, writing PREFIX.txt and PREFIX.collapsed")
+    parser.add_argument('--telemetry', metavar='DIR',
+                        help="write per-generation GA telemetry to DIR/<deal>.jsonl")
+    parser.add_argument('--endgame', type=int, metavar='CARDS',
+                        help="score fitness games from the endgame table once hands are down to CARDS cards")
+    parser.add_argument('--exact-endgame', action='store_true',
+                        help="solve the endgame table with perfect defense instead of OptimalDefense")
+    parser.add_argument('--single-dummy', type=int, default=0, metavar='K',
+                        help="score strategies on K sampled defender layouts instead of the real deal")
+    parser.add_argument('--surrogate', action='store_true',
+                        help="pre-screen children with a ridge-regression surrogate of the fitness")
+    parser.add_argument('--optimizer', choices=['ga', 'cma', 'de'], default='ga',
+                        help="search with the GA, CMA-ES or differential evolution (the last two need NumPy)")
+    parser.add_argument('--low-fidelity', type=int, default=0, metavar='TRICKS',
+                        help="in early generations play only TRICKS tricks of each fitness game and estimate the rest")
+    args = parser.parse_args()
+    if args.optimizer != 'ga' and (args.surrogate or args.low_fidelity):
+        parser.error("--surrogate and --low-fidelity only work with --optimizer ga")
+
+    store = ResultStore()
+    library = GenomeLibrary()
+    if args.workers <= 1:
+        evaluator = SerialEvaluator()
+    elif args.threads:
+        evaluator = ThreadPoolEvaluator(args.workers)
+    else:
+        # Room for every sampled layout of a single-dummy generation
+        evaluator = SharedMemoryEvaluator(args.workers, max_deals=max(64, args.single_dummy))
+    endgame = None
+    if args.endgame:
+        endgame = EndgameTable(max_cards=args.endgame, rules='exact' if args.exact_endgame else 'defense')
+    with profiled(args.profile) if args.profile else contextlib.nullcontext():
+        for deal_file in os.listdir('utils/deals'):
+            if deal_file.endswith('.json'):
+                deal_path = os.path.join('utils/deals', deal_file)
+                print(f"Processing deal: {deal_file}")
+                main(deal_path,40,70,store,library,evaluator,
+                     telemetry_dir=args.telemetry, endgame=endgame, single_dummy=args.single_dummy,
+                     surrogate=args.surrogate, optimizer=args.optimizer, low_fidelity=args.low_fidelity)
+                print("=" * 60)
+    evaluator.close()
+    if endgame is not None:
+        endgame.close()
+    library.close()
+    store.close()
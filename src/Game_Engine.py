@@ -1,5 +1,4 @@
 import json
-import copy
 
 
 RANK_ORDER = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
@@ -33,6 +32,10 @@ def load_deal(filename):
     with open(filename, 'r') as f:
         deal = json.load(f)
 
+    return parse_deal(deal)
+
+def parse_deal(deal):
+    """Deal tuple from the JSON structure used by the deal files"""
     hands = {
         player: [parse_card(c) for c in cards]
         for player, cards in deal["hands"].items()
@@ -48,13 +51,69 @@ def load_deal(filename):
 
     return hands, declarer, trump, contract_level, lead_card, lead_player
 
+def deal_to_json(hands, declarer, trump, contract_level, lead_card, lead_player):
+    """Inverse of parse_deal: the JSON structure of the deal files"""
+    return {
+        "declarer": declarer,
+        "trump": trump,
+        "contract_level": contract_level,
+        "lead": {"card": card_code(lead_card), "player": lead_player},
+        "hands": {player: [card_code(c) for c in hands[player]] for player in SEATS},
+    }
+
+def card_code(card):
+    """Suit-first code used by the deal files, e.g. 'DK' or 'ST'"""
+    return card.suit + ('T' if card.rank_value == 10 else card.rank)
+
+def canonical_deal(hands, declarer, trump, contract_level, lead_card, lead_player):
+    """Order-independent text encoding of a deal, identical for equivalent deal files"""
+    parts = [f"{declarer}", f"{trump}", f"{contract_level}", f"{lead_player}:{card_code(lead_card)}"]
+    for player in "NESW":
+        cards = sorted(hands[player], key=lambda c: (c.suit_value, -c.rank_value))
+        parts.append(player + ":" + ".".join(card_code(c) for c in cards))
+    return "|".join(parts)
+
+SEATS = ['W', 'N', 'E', 'S']
+STRAINS = SUITS + ['NT']
+RANKS_BY_VALUE = {v: r for r, v in RANK_ORDER.items() if r != '10'}
+PACKED_DEAL_SIZE = 64
+
+def card_index(card):
+    """Card as a number 0-51"""
+    return card.suit_value * 13 + card.rank_value - 2
+
+def card_from_index(index):
+    return Card(SUITS[index // 13], RANKS_BY_VALUE[index % 13 + 2])
+
+def pack_deal(hands, declarer, trump, contract_level, lead_card, lead_player):
+    """Deal as PACKED_DEAL_SIZE bytes, keeping the order of cards in each hand"""
+    data = [SEATS.index(declarer), STRAINS.index(trump), contract_level,
+            SEATS.index(lead_player), card_index(lead_card)]
+    for player in SEATS:
+        data.append(len(hands[player]))
+        data.extend(card_index(c) for c in hands[player])
+    return bytes(data).ljust(PACKED_DEAL_SIZE, b'\0')
+
+def unpack_deal(packed):
+    """Inverse of pack_deal, returns the same tuple as load_deal"""
+    declarer, trump, contract_level, lead_player, lead_card = packed[:5]
+    hands = {}
+    pos = 5
+    for player in SEATS:
+        count = packed[pos]
+        hands[player] = [card_from_index(i) for i in packed[pos + 1:pos + 1 + count]]
+        pos += 1 + count
+    return (hands, SEATS[declarer], STRAINS[trump], contract_level,
+            card_from_index(lead_card), SEATS[lead_player])
+
 def get_legal_cards(hand, leading_suit):
     same_suit_cards = [c for c in hand if c.suit == leading_suit]
     return same_suit_cards if same_suit_cards else hand[:]
 
 class GameState:
-    def __init__(self, hands, declarer, trump, contract_level, current_leader):
-        self.hands = copy.deepcopy(hands)
+    def __init__(self, hands, declarer, trump, contract_level, current_leader, record=True):
+        # Cards are never modified, so copying the hand lists is enough
+        self.hands = {player: list(cards) for player, cards in hands.items()}
         self.declarer = declarer
         self.trump = trump
         self.contract_level = contract_level
@@ -66,6 +125,13 @@ class GameState:
         self.partnerships = {"N": "S", "S": "N", "E": "W", "W": "E"}
         self.trick_history = []
         self.cards_played = set()  # Track all played cards
+        self.played_mask = 0  # The same cards as a 52-bit mask of card_index bits
+        # Lean games (record=False) skip trick_history and cards_played; the
+        # play array below is always kept and rebuild_trick_history() turns
+        # it back into trick_history
+        self.record = record
+        self.plays = bytearray(52)  # card_index + 64 * seat, in play order
+        self.play_count = 0
 
     def is_declarer_side(self, player):
         return player == self.declarer or player == self.partnerships[self.declarer]
@@ -77,14 +143,56 @@ class GameState:
         return self.partnerships[player]
 
     def copy(self):
-        new_state = GameState(self.hands, self.declarer, self.trump, self.contract_level, self.current_leader)
+        new_state = GameState(self.hands, self.declarer, self.trump, self.contract_level, self.current_leader,
+                              self.record)
         new_state.declarer_tricks = self.declarer_tricks
         new_state.defender_tricks = self.defender_tricks
         new_state.tricks_played = self.tricks_played
         new_state.trick_history = self.trick_history.copy()
         new_state.cards_played = self.cards_played.copy()
+        new_state.played_mask = self.played_mask
+        new_state.plays[:] = self.plays
+        new_state.play_count = self.play_count
         return new_state
 
+    def play_card(self, player, card):
+        """Move a card from the player's hand to the played cards"""
+        self.hands[player].remove(card)
+        index = card_index(card)
+        self.played_mask |= 1 << index
+        self.plays[self.play_count] = index + 64 * SEATS.index(player)
+        self.play_count += 1
+        if self.record:
+            self.cards_played.add(card)
+
+    def record_trick(self, trick, winner):
+        """Score a finished trick of (card, player) pairs"""
+        if self.is_declarer_side(winner):
+            self.declarer_tricks += 1
+        else:
+            self.defender_tricks += 1
+        self.current_leader = winner
+        self.tricks_played += 1
+        if self.record:
+            self.trick_history.append({
+                'trick_num': self.tricks_played,
+                'winner': winner,
+                'cards': [(player, card) for card, player in trick]
+            })
+
+    def rebuild_trick_history(self):
+        """trick_history of the tricks played so far, decoded from the play array"""
+        history = []
+        for start in range(0, self.play_count - 3, 4):
+            players = [SEATS[code >> 6] for code in self.plays[start:start + 4]]
+            cards = [card_from_index(code & 63) for code in self.plays[start:start + 4]]
+            history.append({
+                'trick_num': start // 4 + 1,
+                'winner': determine_trick_winner(cards, players, self.NT, self.trump),
+                'cards': list(zip(players, cards))
+            })
+        return history
+
     def get_remaining_cards_in_suit(self, suit, exclude_player=None):
         remaining = []
         for player, hand in self.hands.items():
@@ -1,13 +1,48 @@
 from src.Game_Engine import get_legal_cards, get_current_trick_winner
 from src.simulation import simulate_game
-import copy
+from src.defenders import OptimalDefense
+from src.evaluation import SerialEvaluator
+from src.fidelity import HeuristicCompletion
+from src.single_dummy import sample_layouts
+from src.telemetry import TelemetryWriter
+import asyncio
+import functools
+import os
 import random
+import threading
+import time
+import zlib
 
 
+FITNESS_RUNS = 4  # simulated games per strategy per generation
+
+# Fitness noise comes from one generator per thread so evaluator threads never
+# contend on (or, without the GIL, corrupt) the shared module-level generator
+_thread_state = threading.local()
+
+
+def _forget_thread_rng():
+    # A forked child keeps the parent's generator; drop it so the child draws
+    # a fresh one from the module generator, which random reseeds after fork
+    _thread_state.__dict__.pop('rng', None)
+
+
+os.register_at_fork(after_in_child=_forget_thread_rng)
+
+
+def thread_rng():
+    rng = getattr(_thread_state, 'rng', None)
+    if rng is None:
+        rng = _thread_state.rng = random.Random(random.getrandbits(64))
+    return rng
+
 
 class DeclarerStrategy:
-    def __init__(self, genome_size=60):
-        self.genome = [random.uniform(-1, 1) for _ in range(genome_size)]
+    def __init__(self, genome_size=60, genome=None):
+        if genome is not None:
+            self.genome = list(genome)
+        else:
+            self.genome = [random.uniform(-1, 1) for _ in range(genome_size)]
         self.fitness = 0
 
     def choose_card(self, state, player, leading_suit, cards_played_in_trick):
@@ -117,8 +152,9 @@ class DeclarerStrategy:
                 gene_idx += 1
 
             # Fill remaining genome with random features for diversity
+            # (crc32 rather than hash() so a genome means the same thing in every process)
             while gene_idx < len(self.genome):
-                feature_value = hash(str(card) + str(gene_idx) + str(state.tricks_played)) % 100 / 100.0
+                feature_value = zlib.crc32(f"{card}{gene_idx}{state.tricks_played}".encode()) % 100 / 100.0
                 score += self.genome[gene_idx] * feature_value
                 gene_idx += 1
                 if gene_idx >= len(self.genome):
@@ -162,107 +198,259 @@ class DeclarerStrategy:
 
         return child
 
-def genetic_algorithm(hands, declarer, trump, contract_level, lead_card, lead_player,
-                      population_size=40, generations=70):
-    """Enhanced genetic algorithm with better fitness evaluation"""
+def score_result(made_contract, tricks, contract_level):
+    """Score of a single played game"""
+    base_score = tricks * 10  # Base score for tricks taken
 
-    # Initialize population with diverse strategies
-    population = [DeclarerStrategy() for _ in range(population_size)]
+    if made_contract:
+        base_score += 100  # Bonus for making contract
+        overtricks = tricks - (6 + contract_level)
+        base_score += overtricks * 20  # Bonus for overtricks
+    else:
+        # Penalty for failing, but still reward close attempts
+        undertricks = (6 + contract_level) - tricks
+        base_score -= undertricks * 10
+
+    return base_score
+
+
+def evaluate_fitness(strategy, deal, runs=FITNESS_RUNS, defense=OptimalDefense, endgame=None):
+    """Fitness of a strategy on one deal: average of noisy runs scaled by stability"""
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+    fitness_scores = []
+
+    # Test strategy multiple times for robustness
+    for test_run in range(runs):
+        made_contract, tricks, final_state = simulate_game(
+            hands, declarer, trump, contract_level, lead_card, lead_player, strategy, defense, endgame,
+            record=False)
+
+        base_score = score_result(made_contract, tricks, contract_level)
+
+        # Bonus for consistent performance
+        base_score += thread_rng().uniform(-5, 5)  # Small random factor
+
+        fitness_scores.append(base_score)
+
+    # Strategy fitness is average performance with stability bonus
+    avg_fitness = sum(fitness_scores) / len(fitness_scores)
+    stability = 1 / (1 + (max(fitness_scores) - min(fitness_scores)) / 10)
+    return avg_fitness * stability
+
+
+def fitness_function(defense=None, endgame=None):
+    """evaluate_fitness, bound to a defense and endgame table when given"""
+    options = {name: value for name, value in (('defense', defense), ('endgame', endgame)) if value is not None}
+    return functools.partial(evaluate_fitness, **options) if options else evaluate_fitness
+
+
+def has_converged(best_fitness_history):
+    """Past generation 50 with less than 5 fitness gained over the last 25 generations"""
+    if len(best_fitness_history) <= 51:
+        return False
+    return best_fitness_history[-1] - best_fitness_history[-25] < 5  # Very small improvement
+
+
+def breed(population, population_size, generation, generations, elite_fraction=0.2,
+          mutation_rate=0.1, late_mutation_rate=0.05, surrogate=None, oversample=4):
+    """Next generation from a population sorted best first: elitism, tournaments, crossover, mutation
+
+    mutation_rate applies in the first half of the run, late_mutation_rate after.
+    With a trained surrogate, oversample times as many children are bred and
+    only those it predicts to be fittest are kept.
+    """
+    elite_size = int(population_size * elite_fraction)  # Keep top 20% by default
+    next_generation = population[:elite_size]
+    children_needed = population_size - elite_size
+    candidates = children_needed * oversample if surrogate is not None and surrogate.ready() else children_needed
+    children = []
+
+    # Crossover and mutation
+    while len(children) < candidates:
+        # Tournament selection
+        tournament_size = 5
+        parent1 = max(random.sample(population[:population_size // 2], tournament_size),
+                      key=lambda x: x.fitness)
+        parent2 = max(random.sample(population[:population_size // 2], tournament_size),
+                      key=lambda x: x.fitness)
+
+        child = parent1.crossover(parent2)
+
+        # Adaptive mutation rate
+        child.mutate(mutation_rate if generation < generations // 2 else late_mutation_rate)
+
+        children.append(child)
+
+    if surrogate is not None:
+        children = surrogate.screen(children, children_needed)
+    return next_generation + children
+
+
+def evolve(hands, declarer, trump, contract_level, lead_card, lead_player,
+           population_size=40, generations=70, *, initial_genomes=None, evaluator=None, telemetry=None,
+           defense=None, endgame=None, elite_fraction=0.2, mutation_rate=0.1, late_mutation_rate=0.05,
+           single_dummy=0, surrogate=None, oversample=4, low_fidelity=0, switch_diversity=0.1):
+    """Run the genetic algorithm as a generator, yielding a snapshot after every generation
+
+    Each snapshot is a dict with the generation number, the best strategy and
+    its fitness, the population sorted best first, the population mean, the
+    generation stats (the same record that goes to telemetry), the fidelity
+    of the generation's fitness ('low' or 'full') and whether the run has
+    converged. The caller may stop iterating at any time.
+
+    initial_genomes seeds part of the first population. evaluator runs the
+    fitness step, serially unless a pool-based evaluator is passed; telemetry
+    receives one JSON record per generation. defense and endgame are bound
+    into the fitness games (a defense needs an in-process evaluator).
+    single_dummy=K scores on K sample_layouts, redrawn every generation. The
+    breeding options and surrogate go to breed(). low_fidelity=k scores with
+    HeuristicCompletion(k) until the genome diversity drops below
+    switch_diversity or the run is halfway; the surrogate starts over at the
+    switch, and only full-fidelity generations count toward convergence.
+    """
+    deal = (hands, declarer, trump, contract_level, lead_card, lead_player)
+    deals = [deal]
+    evaluator = evaluator or SerialEvaluator()
+    full_fitness_fn = fitness_function(defense, endgame)
+    fitness_fn = full_fitness_fn
+    full_since = 0
+    if low_fidelity:
+        fitness_fn = fitness_function(defense, HeuristicCompletion(low_fidelity))
+        full_since = None
+    stats_writer = TelemetryWriter(telemetry)
 
-    print(f"Running enhanced genetic algorithm...")
-    print(f"Population: {population_size}, Generations: {generations}")
-    print(f"Using improved optimal defense simulation\n")
+    # Initialize population with diverse strategies
+    population = [DeclarerStrategy(genome=genome) for genome in (initial_genomes or [])[:population_size]]
+    population += [DeclarerStrategy() for _ in range(population_size - len(population))]
 
     best_fitness_history = []
 
-    for generation in range(generations):
-        # Evaluate fitness for each strategy
-        for strategy in population:
-            fitness_scores = []
-
-            # Test strategy multiple times for robustness
-            for test_run in range(4):  # More thorough testing
-                test_hands = copy.deepcopy(hands)
-
-                # Add very slight random variations to test robustness
-                if test_run > 0:
-                    # Occasionally swap equivalent cards to test robustness
-                    for player in test_hands:
-                        if len(test_hands[player]) > 1 and random.random() < 0.1:
-                            # Swap two cards of same rank in different suits (if any)
-                            same_rank_cards = {}
-                            for card in test_hands[player]:
-                                if card.rank not in same_rank_cards:
-                                    same_rank_cards[card.rank] = []
-                                same_rank_cards[card.rank].append(card)
-
-                            for rank, cards in same_rank_cards.items():
-                                if len(cards) >= 2 and random.random() < 0.3:
-                                    # Small variation for testing
-                                    pass
-
-                made_contract, tricks, final_state = simulate_game(
-                    test_hands, declarer, trump, contract_level, lead_card, lead_player, strategy)
-
-                # Enhanced fitness calculation
-                base_score = tricks * 10  # Base score for tricks taken
-
-                if made_contract:
-                    base_score += 100  # Bonus for making contract
-                    overtricks = tricks - (6 + contract_level)
-                    base_score += overtricks * 20  # Bonus for overtricks
-                else:
-                    # Penalty for failing, but still reward close attempts
-                    undertricks = (6 + contract_level) - tricks
-                    base_score -= undertricks * 10
-
-                # Bonus for consistent performance
-                base_score += random.uniform(-5, 5)  # Small random factor
-
-                fitness_scores.append(base_score)
-
-            # Strategy fitness is average performance with stability bonus
-            avg_fitness = sum(fitness_scores) / len(fitness_scores)
-            stability = 1 / (1 + (max(fitness_scores) - min(fitness_scores)) / 10)
-            strategy.fitness = avg_fitness * stability
-
-        # Sort by fitness
-        population.sort(key=lambda x: x.fitness, reverse=True)
-        best_fitness = population[0].fitness
-        best_fitness_history.append(best_fitness)
+    try:
+        for generation in range(generations):
+            # Evaluate fitness for each strategy
+            if single_dummy:
+                deals = sample_layouts(deal, single_dummy)
+            evaluation_start = time.perf_counter()
+            evaluator.evaluate(population, deals, fitness_fn)
+            evaluation_time = time.perf_counter() - evaluation_start
+            if surrogate is not None:
+                for strategy in population:
+                    surrogate.add(strategy.genome, strategy.fitness)
+
+            # Sort by fitness
+            population.sort(key=lambda x: x.fitness, reverse=True)
+            best_fitness = population[0].fitness
+            best_fitness_history.append(best_fitness)
+            stats = stats_writer.record(generation, population, len(population) * len(deals) * FITNESS_RUNS,
+                                        evaluation_time)
+
+            fidelity = 'full' if fitness_fn is full_fitness_fn else 'low'
+            if full_since is None and (stats['diversity'] < switch_diversity or generation + 1 >= generations // 2):
+                # The population has settled: play the games in full from the next generation on
+                fitness_fn = full_fitness_fn
+                full_since = generation + 1
+                if surrogate is not None:
+                    # Estimated and played-out scores are on different scales
+                    surrogate.reset()
+
+            # Early stopping if converged
+            converged = (has_converged(best_fitness_history) and full_since is not None
+                         and generation - full_since >= 25)
+
+            yield {
+                'generation': generation,
+                'best': population[0],
+                'fitness': best_fitness,
+                'population': population,
+                'mean': stats['mean'],
+                'stats': stats,
+                'fidelity': fidelity,
+                'converged': converged,
+            }
+
+            if converged or generation == generations - 1:
+                break
 
-        if generation % 25 == 0 or generation == generations - 1:
-            avg_fitness = sum(s.fitness for s in population) / len(population)
-            print(f"Generation {generation:3d}: Best={best_fitness:6.1f}, Avg={avg_fitness:6.1f}")
-
-        # Early stopping if converged
-        if generation > 50:
-            recent_improvement = best_fitness_history[-1] - best_fitness_history[-25]
-            if recent_improvement < 5:  # Very small improvement
-                print(f"Early stopping at generation {generation} - converged")
+            # Create next generation with elitism
+            population = breed(population, population_size, generation, generations,
+                               elite_fraction, mutation_rate, late_mutation_rate, surrogate, oversample)
+    finally:
+        stats_writer.close()
+
+
+async def evolve_async(*args, **kwargs):
+    """Async iterator over evolve() snapshots
+
+    Every generation runs in a worker thread, so several deals can be evolved
+    interleaved on one event loop without blocking it.
+    """
+    generator = evolve(*args, **kwargs)
+    done = object()
+    pending = None
+    try:
+        while True:
+            # Shielded, so a cancelled consumer leaves the generation running to its end
+            pending = asyncio.ensure_future(asyncio.to_thread(next, generator, done))
+            snapshot = await asyncio.shield(pending)
+            pending = None
+            if snapshot is done:
                 break
+            yield snapshot
+    finally:
+        if pending is not None:
+            # The generator cannot be closed while the worker thread is still inside it
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()
+        generator.close()
 
-        # Create next generation with elitism
-        elite_size = population_size // 5  # Keep top 20%
-        next_generation = population[:elite_size]
 
-        # Crossover and mutation
-        while len(next_generation) < population_size:
-            # Tournament selection
-            tournament_size = 5
-            parent1 = max(random.sample(population[:population_size // 2], tournament_size),
-                          key=lambda x: x.fitness)
-            parent2 = max(random.sample(population[:population_size // 2], tournament_size),
-                          key=lambda x: x.fitness)
+def genetic_algorithm(hands, declarer, trump, contract_level, lead_card, lead_player,
+                      population_size=40, generations=70, *, initial_genomes=None, history=None,
+                      evaluator=None, telemetry=None, defense=None, endgame=None,
+                      elite_fraction=0.2, mutation_rate=0.1, late_mutation_rate=0.05, single_dummy=0,
+                      surrogate=None, oversample=4, optimizer=None, low_fidelity=0):
+    """Enhanced genetic algorithm with better fitness evaluation
+
+    Blocking wrapper around evolve() that prints progress and returns the best
+    strategy. If a history list is given, the best fitness of every
+    generation is appended to it. optimizer swaps evolve() for another
+    generator with the same snapshots, e.g. src.optimizers.evolve_cma; the
+    GA-only arguments are not passed to it, and a surrogate or low_fidelity
+    with an optimizer is an error rather than silently ignored.
+    """
+    if optimizer is not None and (surrogate is not None or low_fidelity):
+        raise ValueError("surrogate and low_fidelity only apply to the GA, not to another optimizer")
 
-            child = parent1.crossover(parent2)
+    print(f"Running enhanced genetic algorithm...")
+    print(f"Population: {population_size}, Generations: {generations}")
+    print(f"Using improved optimal defense simulation\n")
 
-            # Adaptive mutation rate
-            mutation_rate = 0.1 if generation < generations // 2 else 0.05
-            child.mutate(mutation_rate)
+    if optimizer is None:
+        snapshots = evolve(hands, declarer, trump, contract_level, lead_card, lead_player,
+                           population_size=population_size, generations=generations,
+                           initial_genomes=initial_genomes, evaluator=evaluator, telemetry=telemetry,
+                           defense=defense, endgame=endgame, elite_fraction=elite_fraction,
+                           mutation_rate=mutation_rate, late_mutation_rate=late_mutation_rate,
+                           single_dummy=single_dummy, surrogate=surrogate, oversample=oversample,
+                           low_fidelity=low_fidelity)
+    else:
+        snapshots = optimizer(hands, declarer, trump, contract_level, lead_card, lead_player,
+                              population_size=population_size, generations=generations,
+                              initial_genomes=initial_genomes, evaluator=evaluator, telemetry=telemetry,
+                              defense=defense, endgame=endgame, single_dummy=single_dummy)
+
+    best = None
+    for snapshot in snapshots:
+        generation = snapshot['generation']
+        best = snapshot['best']
+        if history is not None:
+            history.append(snapshot['fitness'])
 
-            next_generation.append(child)
+        if generation % 25 == 0 or generation == generations - 1:
+            print(f"Generation {generation:3d}: Best={snapshot['fitness']:6.1f}, Avg={snapshot['mean']:6.1f}")
 
-        population = next_generation
+        if snapshot['converged']:
+            print(f"Early stopping at generation {generation} - converged")
 
-    return population[0]  # Return best strategy
+    return best  # Return best strategy
@@ -1,4 +1,5 @@
-from src.Game_Engine import get_legal_cards, get_current_trick_winner
+from src.Game_Engine import get_legal_cards, get_current_trick_winner, card_index
+from src.instrumentation import record_cache
 
 
 class OptimalDefense:
@@ -388,4 +389,158 @@ class OptimalDefense:
             return True
         elif led_card.rank_value <= 7:  # Low card - might be fourth best
             return True
-        return False
\ No newline at end of file
+        return False
+
+class CachedDefense:
+    """OptimalDefense with its decisions memoised, for games played on one deal
+
+    The remaining hands follow from the deal and the cards played so far, so
+    a decision is keyed by the strain, the player, the played-card mask and
+    the cards in the current trick. Declarer's identity never enters the
+    defensive evaluation, so one cache serves every declarer of a side. Use
+    a separate instance per deal (and per hand ordering, which breaks ties).
+    Misses are decided by TabulatedDefense, which plays the same cards.
+    """
+
+    def __init__(self):
+        self.decisions = {}
+
+    def choose_defensive_card(self, state, player, leading_suit, cards_played_in_trick):
+        trick_mask = 0
+        for card, _ in cards_played_in_trick:
+            trick_mask |= 1 << card_index(card)
+        key = (state.trump, player, state.played_mask, trick_mask)
+
+        card = self.decisions.get(key)
+        record_cache('defense', card is not None)
+        if card is None:
+            card = TabulatedDefense.choose_defensive_card(state, player, leading_suit, cards_played_in_trick)
+            self.decisions[key] = card
+        return card
+
+
+class TabulatedDefense:
+    """OptimalDefense with each card scored by a table lookup
+
+    Every OptimalDefense score is a function of a few small discrete values:
+    partner winning, position in trick, the card's relation to the led suit
+    and trumps, its rank, the rank (and trumpness) of the winning card, the
+    number of higher cards outstanding, suit and trump length. The tables are
+    indexed by those keys and each entry is filled from the branchy evaluator
+    the first time the key comes up, after which that case is a single list
+    lookup. Scores and tie-breaking are identical, so it plays exactly the
+    same cards as OptimalDefense. The tables are shared by all instances.
+    """
+
+    # [partner_winning][follows_suit/trumps][rank][winning rank][winning card is trump][3+ trumps]
+    trump_follow = [None] * (2 * 2 * 13 * 13 * 2 * 2)
+    # [partner_winning][position 1-3][rank][winning rank][led from strength][leader winning]
+    nt_follow = [None] * (2 * 3 * 13 * 13 * 2 * 2)
+    # [rank][higher cards outstanding]
+    trump_discard = [None] * (13 * 13)
+    # [rank][higher cards outstanding][suit length <= 2][major]
+    nt_discard = [None] * (13 * 13 * 2 * 2)
+    # [rank][trump][suit length 0-13][5+ trumps][ace in suit]
+    trump_lead = [None] * (13 * 2 * 14 * 2 * 2)
+    # [suit holding as 13 rank bits][rank]
+    nt_lead = [None] * (8192 * 13)
+
+    @staticmethod
+    def choose_defensive_card(state, player, leading_suit, cards_played_in_trick):
+        hand = state.hands[player]
+        legal_cards = get_legal_cards(hand, leading_suit)
+
+        if len(legal_cards) == 1:
+            return legal_cards[0]
+
+        if leading_suit is None:
+            keys = TabulatedDefense._lead_keys(state, hand, legal_cards)
+            context = (None, cards_played_in_trick, False, None, None)
+        else:
+            current_winner, winning_card = get_current_trick_winner(cards_played_in_trick, state.NT, state.trump)
+            partner_winning = current_winner == state.get_partner(player)
+            keys = TabulatedDefense._follow_keys(state, player, hand, legal_cards, leading_suit,
+                                                 cards_played_in_trick, partner_winning, current_winner,
+                                                 winning_card)
+            context = (leading_suit, cards_played_in_trick, partner_winning, current_winner, winning_card)
+
+        best_card = None
+        best_score = float('inf')
+
+        for card, (table, key) in zip(legal_cards, keys):
+            score = table[key]
+            if score is None:
+                # First time this key comes up: fill the entry from the branchy evaluator
+                score = table[key] = OptimalDefense._evaluate_defensive_card(state, player, card, *context)
+            if score < best_score:
+                best_score = score
+                best_card = card
+
+        return best_card
+
+    @staticmethod
+    def _lead_keys(state, hand, legal_cards):
+        holdings = {'S': 0, 'H': 0, 'D': 0, 'C': 0}
+        for c in hand:
+            holdings[c.suit] |= 1 << c.rank_value
+
+        if state.NT:
+            table = TabulatedDefense.nt_lead
+            return [(table, (holdings[c.suit] >> 2) * 13 + c.rank_value - 2) for c in legal_cards]
+
+        table = TabulatedDefense.trump_lead
+        long_trumps = holdings[state.trump].bit_count() >= 5
+        keys = []
+        for c in legal_cards:
+            holding = holdings[c.suit]
+            keys.append((table, ((((c.rank_value - 2) * 2 + (c.suit == state.trump)) * 14
+                                  + holding.bit_count()) * 2 + long_trumps) * 2 + (holding >> 14 & 1)))
+        return keys
+
+    @staticmethod
+    def _follow_keys(state, player, hand, legal_cards, leading_suit, cards_played_in_trick,
+                     partner_winning, current_winner, winning_card):
+        if state.NT:
+            first_card, first_player = cards_played_in_trick[0]
+            follow_table = TabulatedDefense.nt_follow
+            row = (partner_winning * 3 + len(cards_played_in_trick) - 1) * 13
+            column = ((winning_card.rank_value - 2) * 4
+                      + OptimalDefense._partner_led_from_strength(first_card) * 2
+                      + (current_winner == first_player))
+        else:
+            follow_table = TabulatedDefense.trump_follow
+            row = partner_winning * 26
+            column = ((winning_card.rank_value - 2) * 4
+                      + (winning_card.suit == state.trump) * 2
+                      + (sum(1 for c in hand if c.suit == state.trump) >= 3))
+
+        keys = []
+        outstanding = {}
+        for c in legal_cards:
+            rank = c.rank_value - 2
+            if c.suit == leading_suit:
+                keys.append((follow_table, (row + rank) * 52 + column))
+            elif not state.NT and c.suit == state.trump:
+                keys.append((follow_table, (row + 13 + rank) * 52 + column))
+            else:
+                if c.suit not in outstanding:
+                    outstanding[c.suit] = TabulatedDefense._outstanding(state, player, c.suit)
+                higher_out = (outstanding[c.suit] >> (c.rank_value + 1)).bit_count()
+                if state.NT:
+                    short = sum(1 for h in hand if h.suit == c.suit) <= 2
+                    keys.append((TabulatedDefense.nt_discard,
+                                 ((rank * 13 + higher_out) * 2 + short) * 2 + (c.suit in ('S', 'H'))))
+                else:
+                    keys.append((TabulatedDefense.trump_discard, rank * 13 + higher_out))
+        return keys
+
+    @staticmethod
+    def _outstanding(state, player, suit):
+        """Ranks of the suit still held by the other three players, as bits"""
+        bits = 0
+        for other, cards in state.hands.items():
+            if other != player:
+                for c in cards:
+                    if c.suit == suit:
+                        bits |= 1 << c.rank_value
+        return bits
@@ -0,0 +1,208 @@
+"""Endgame tablebase: declarer's tricks from small end positions, solved once and stored.
+
+A position is the cards left in each hand, the strain and the player on lead
+at a trick boundary, with seats taken relative to declarer. Under the
+'defense' rules the defenders play OptimalDefense (via TabulatedDefense,
+ties broken in card order) and declarer takes the line that wins the most
+tricks against it; under the 'exact' rules the defenders also play
+perfectly. Positions are solved the first time they are looked up, kept in a
+bounded in-memory LRU and written to SQLite, so the table grows across runs.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from src.Game_Engine import GameState, SEATS, STRAINS, card_index, determine_trick_winner, get_legal_cards
+from src.defenders import TabulatedDefense
+from src.instrumentation import record_cache
+
+
+DEFAULT_ENDGAME_PATH = 'utils/deals/endgame.db'
+RULES = ['defense', 'exact']
+FLUSH_EVERY = 1000
+
+# Tables unpickled in this process, keyed by pid and config, see open_table
+_open_tables = {}
+
+
+def position_key(hands, declarer, trump, leader, rules='defense'):
+    """Signed 64-bit hash of a position, seats relative to declarer"""
+    start = SEATS.index(declarer)
+    data = bytearray()
+    for offset in range(4):
+        mask = 0
+        for card in hands[SEATS[(start + offset) % 4]]:
+            mask |= 1 << card_index(card)
+        data += mask.to_bytes(7, 'little')
+    data += bytes([(SEATS.index(leader) - start) % 4, STRAINS.index(trump), RULES.index(rules)])
+    return int.from_bytes(hashlib.blake2b(bytes(data), digest_size=8).digest(), 'little', signed=True)
+
+
+class EndgameTable:
+    """Declarer's tricks for positions with at most max_cards cards per hand
+
+    Pass one as simulate_game's endgame to finish games from the table. It
+    can be sent to worker processes: each process unpickles it into one
+    table of its own (see open_table), which keeps its cache across tasks.
+    New entries are written every FLUSH_EVERY positions, by flush_open_tables()
+    and on close(). Threads of a ThreadPoolEvaluator share one table: the
+    cache, pending entries and connection are used under a lock, which is
+    not held while a position is being solved.
+    """
+
+    def __init__(self, path=DEFAULT_ENDGAME_PATH, max_cards=4, rules='defense', cache_size=100000):
+        if rules not in RULES:
+            raise ValueError(f"rules must be one of {RULES}, not {rules!r}")
+        self.path = path
+        self.max_cards = max_cards
+        self.rules = rules
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = []
+        self.solved = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS endgame (
+                position INTEGER PRIMARY KEY,
+                tricks INTEGER NOT NULL
+            )""")
+        self.conn.commit()
+
+    def __reduce__(self):
+        return open_table, (self.path, self.max_cards, self.rules, self.cache_size)
+
+    def covers(self, state):
+        """True at a trick boundary with at most max_cards cards in every hand"""
+        sizes = [len(hand) for hand in state.hands.values()]
+        return 0 < max(sizes) <= self.max_cards and min(sizes) == max(sizes)
+
+    def finish(self, state):
+        """Score the rest of the game from the table, as if the tricks had been played"""
+        remaining = len(state.hands[state.current_leader])
+        tricks = self.declarer_tricks(state.hands, state.declarer, state.trump, state.current_leader)
+        state.declarer_tricks += tricks
+        state.defender_tricks += remaining - tricks
+        state.tricks_played += remaining
+
+    def declarer_tricks(self, hands, declarer, trump, leader):
+        """Declarer's tricks from the position, solving it if it is not in the table yet"""
+        key = position_key(hands, declarer, trump, leader, self.rules)
+        tricks = self._get(key)
+        record_cache('endgame', tricks is not None)
+        if tricks is None:
+            tricks = self._solve(hands, declarer, trump, leader)
+            self._put(key, tricks)
+        return tricks
+
+    def _get(self, key):
+        with self.lock:
+            tricks = self.cache.get(key)
+            if tricks is not None:
+                self.cache.move_to_end(key)
+                return tricks
+            row = self.conn.execute("SELECT tricks FROM endgame WHERE position = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def _put(self, key, tricks):
+        with self.lock:
+            self._remember(key, tricks)
+            self.pending.append((key, tricks))
+            self.solved += 1
+            if len(self.pending) >= FLUSH_EVERY:
+                self._write()
+
+    def _remember(self, key, tricks):
+        self.cache[key] = tricks
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _solve(self, hands, declarer, trump, leader):
+        # Canonical card order, so the result depends only on the position
+        state = GameState({p: sorted(cards, key=card_index) for p, cards in hands.items()},
+                          declarer, trump, 1, leader)
+        lead_index = SEATS.index(leader)
+        trick_order = SEATS[lead_index:] + SEATS[:lead_index]
+        return self._search(state, trick_order, [], [], len(state.hands[leader]))
+
+    def _search(self, state, trick_order, cards, players, remaining):
+        """Best declarer tricks from a partly played trick"""
+        if len(cards) == 4:
+            winner = determine_trick_winner(cards, players, state.NT, state.trump)
+            tricks = 1 if state.is_declarer_side(winner) else 0
+            if remaining > 1:
+                tricks += self.declarer_tricks(state.hands, state.declarer, state.trump, winner)
+            return tricks
+
+        player = trick_order[len(cards)]
+        leading_suit = cards[0].suit if cards else None
+        declarer_side = state.is_declarer_side(player)
+        if declarer_side or self.rules == 'exact':
+            candidates = get_legal_cards(state.hands[player], leading_suit)
+        else:
+            candidates = [TabulatedDefense.choose_defensive_card(state, player, leading_suit,
+                                                                 list(zip(cards, players)))]
+
+        best = None
+        for card in candidates:
+            hand = state.hands[player]
+            position = hand.index(card)
+            hand.pop(position)
+            tricks = self._search(state, trick_order, cards + [card], players + [player], remaining)
+            hand.insert(position, card)
+
+            if best is None or (tricks > best if declarer_side else tricks < best):
+                best = tricks
+            # Stop once the side to play can do no better
+            if best == (remaining if declarer_side else 0):
+                break
+        return best
+
+    def flush(self):
+        with self.lock:
+            self._write()
+
+    def _write(self):
+        if self.pending:
+            self.conn.executemany("INSERT OR IGNORE INTO endgame VALUES (?, ?)", self.pending)
+            self.conn.commit()
+            self.pending = []
+
+    def __len__(self):
+        with self.lock:
+            self._write()
+            return self.conn.execute("SELECT COUNT(*) FROM endgame").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self._write()
+            self.conn.close()
+        for key, table in list(_open_tables.items()):
+            if table is self:
+                del _open_tables[key]
+
+
+def open_table(path=DEFAULT_ENDGAME_PATH, max_cards=4, rules='defense', cache_size=100000):
+    """This process's table for the config, opened on first use
+
+    Unpickling goes through here, so a worker that receives the table with
+    every task reuses one connection and one warm cache. The pid is part of
+    the key because forked children must not share the parent's connection.
+    """
+    key = (os.getpid(), path, max_cards, rules, cache_size)
+    table = _open_tables.get(key)
+    if table is None:
+        table = _open_tables[key] = EndgameTable(path, max_cards, rules, cache_size)
+    return table
+
+
+def flush_open_tables():
+    """Write pending entries of this process's tables; pool workers call it after each task"""
+    for (pid, *_), table in _open_tables.items():
+        if pid == os.getpid():
+            table.flush()
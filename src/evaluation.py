@@ -0,0 +1,68 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+def gil_enabled():
+    """False only on a free-threaded CPython build running without the GIL"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+class SerialEvaluator:
+    """Evaluate a population in the current process, one strategy after another
+
+    Every evaluator exposes evaluate(population, deals, fitness_fn): it sets
+    strategy.fitness to the mean of fitness_fn(strategy, deal) over the deals.
+    fitness_fn must be a module-level function so pool-based evaluators can
+    send it to their workers by reference.
+    """
+
+    def evaluate(self, population, deals, fitness_fn):
+        for strategy in population:
+            strategy.fitness = sum(fitness_fn(strategy, deal) for deal in deals) / len(deals)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ThreadPoolEvaluator(SerialEvaluator):
+    """Evaluate a population on a thread pool, for free-threaded (no-GIL) CPython
+
+    Threads share the strategies and deals directly, so nothing is pickled and
+    there is no process start-up. With the GIL enabled threads cannot run the
+    simulation in parallel, so evaluation falls back to the serial loop.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.pool = None
+        if gil_enabled():
+            print("GIL is enabled - thread-pool evaluation falls back to serial")
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def evaluate(self, population, deals, fitness_fn):
+        if self.pool is None:
+            return super().evaluate(population, deals, fitness_fn)
+
+        def evaluate_slice(strategies):
+            for strategy in strategies:
+                strategy.fitness = sum(fitness_fn(strategy, deal) for deal in deals) / len(deals)
+
+        chunk = max(1, -(-len(population) // (self.workers * 2)))
+        futures = [self.pool.submit(evaluate_slice, population[start:start + chunk])
+                   for start in range(0, len(population), chunk)]
+        for future in futures:
+            future.result()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,91 @@
+"""Low-fidelity fitness: play the first tricks, estimate the rest.
+
+HeuristicCompletion plugs into simulate_game's endgame slot. Once the given
+number of tricks has been played it stops the game and credits the remaining
+tricks from a quick look at the position: each side's sure winners (the run
+of top cards it holds in a suit), trump control (extra trump length when
+declarer's side holds the top trump) and the share of the outstanding
+honours each side holds, which splits the tricks nobody is sure of.
+"""
+from src.Game_Engine import SEATS, SUITS
+
+
+HONOUR_POINTS = {14: 4, 13: 3, 12: 2, 11: 1}
+
+
+def sure_winners(cards, side):
+    """Tricks side can cash from the top of one suit: its run of top cards, up to its longer holding"""
+    ranked = sorted(cards, key=lambda entry: entry[0].rank_value, reverse=True)
+    run = 0
+    for card, seat in ranked:
+        if seat not in side:
+            break
+        run += 1
+    longest = max(sum(1 for _, seat in cards if seat == player) for player in side)
+    return min(run, longest)
+
+
+def estimate_declarer_tricks(hands, declarer, trump):
+    """Declarer's tricks from a position at a trick boundary, without playing it out"""
+    seat = SEATS.index(declarer)
+    declarer_side = (declarer, SEATS[(seat + 2) % 4])
+    defenders = (SEATS[(seat + 1) % 4], SEATS[(seat + 3) % 4])
+    remaining = len(hands[declarer])
+
+    declarer_sure = defender_sure = 0
+    declarer_honours = defender_honours = 0
+    for suit in SUITS:
+        cards = [(card, player) for player in SEATS for card in hands[player] if card.suit == suit]
+        if not cards:
+            continue
+        if suit == trump:
+            longest = {side: max(sum(1 for _, p in cards if p == player) for player in side)
+                       for side in (declarer_side, defenders)}
+            top_owner = max(cards, key=lambda entry: entry[0].rank_value)[1]
+            controller, other = (declarer_side, defenders) if top_owner in declarer_side else (defenders, declarer_side)
+            # The side with the top trump draws the others' trumps and keeps its extra length
+            control = max(sure_winners(cards, controller), longest[controller] - longest[other])
+            if controller is declarer_side:
+                declarer_sure += control
+            else:
+                defender_sure += control
+        else:
+            declarer_sure += sure_winners(cards, declarer_side)
+            defender_sure += sure_winners(cards, defenders)
+
+        for card, player in cards:
+            points = HONOUR_POINTS.get(card.rank_value, 0)
+            if player in declarer_side:
+                declarer_honours += points
+            else:
+                defender_honours += points
+
+    declarer_sure = min(declarer_sure, remaining)
+    defender_sure = min(defender_sure, remaining - declarer_sure)
+    open_tricks = remaining - declarer_sure - defender_sure
+    honours = declarer_honours + defender_honours
+    share = declarer_honours / honours if honours else 0.5
+    return declarer_sure + round(open_tricks * share)
+
+
+class HeuristicCompletion:
+    """simulate_game endgame that plays tricks tricks and estimates the rest
+
+    Like EndgameTable it has covers() and finish(), and it pickles as is, so
+    it can be bound into the fitness function and sent to pool evaluators.
+    evolve(low_fidelity=k) scores its early, exploration-heavy generations
+    with one and switches to full games once the population has settled.
+    """
+
+    def __init__(self, tricks=6):
+        self.tricks = tricks
+
+    def covers(self, state):
+        return state.tricks_played >= self.tricks and len(state.hands[state.current_leader]) > 0
+
+    def finish(self, state):
+        remaining = len(state.hands[state.current_leader])
+        tricks = estimate_declarer_tricks(state.hands, state.declarer, state.trump)
+        state.declarer_tricks += tricks
+        state.defender_tricks += remaining - tricks
+        state.tricks_played += remaining
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+
+from src.Game_Engine import canonical_deal
+
+
+DEFAULT_LIBRARY_PATH = 'utils/deals/genomes.db'
+HCP = {11: 1, 12: 2, 13: 3, 14: 4}
+
+
+def deal_features(deal):
+    """Cheap features used to find similar deals: strain, level, N/S HCP, trump fit, lead suit"""
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+    partner = {"N": "S", "S": "N", "E": "W", "W": "E"}[declarer]
+    our_cards = hands[declarer] + hands[partner]
+
+    return {
+        'strain': trump,
+        'level': contract_level,
+        'hcp': sum(HCP.get(c.rank_value, 0) for c in our_cards),
+        'fit': 0 if trump == "NT" else len([c for c in our_cards if c.suit == trump]),
+        'lead_suit': lead_card.suit,
+    }
+
+
+def feature_distance(a, b):
+    """Distance between two feature dicts, strain differences weigh the most"""
+    distance = 0.0
+    if a['strain'] != b['strain']:
+        distance += 5.0 if "NT" in (a['strain'], b['strain']) else 2.0
+    distance += abs(a['level'] - b['level'])
+    distance += abs(a['hcp'] - b['hcp']) / 3.0
+    distance += abs(a['fit'] - b['fit'])
+    # A trump lead and a side-suit lead call for different plans
+    a_trump_lead = a['lead_suit'] == a['strain']
+    b_trump_lead = b['lead_suit'] == b['strain']
+    if a_trump_lead != b_trump_lead:
+        distance += 1.0
+    return distance
+
+
+class GenomeLibrary:
+    """Persistent library of evolved genomes indexed by deal features"""
+
+    def __init__(self, path=DEFAULT_LIBRARY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS genomes (
+                deal TEXT PRIMARY KEY,
+                strain TEXT NOT NULL,
+                level INTEGER NOT NULL,
+                hcp INTEGER NOT NULL,
+                fit INTEGER NOT NULL,
+                lead_suit TEXT NOT NULL,
+                fitness REAL NOT NULL,
+                genome TEXT NOT NULL
+            )""")
+        self.conn.commit()
+
+    def add(self, deal, strategy):
+        """Remember the best genome for a deal, keeping the fitter one on repeats"""
+        features = deal_features(deal)
+        key = canonical_deal(*deal)
+        row = self.conn.execute("SELECT fitness FROM genomes WHERE deal = ?", (key,)).fetchone()
+        if row is not None and row[0] >= strategy.fitness:
+            return
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO genomes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, features['strain'], features['level'], features['hcp'], features['fit'],
+             features['lead_suit'], strategy.fitness, json.dumps(strategy.genome)))
+        self.conn.commit()
+
+    def nearest(self, deal, k=8, exclude_self=False):
+        """Genomes of the k most similar deals in the library, closest first"""
+        features = deal_features(deal)
+        key = canonical_deal(*deal)
+        candidates = []
+
+        for row in self.conn.execute(
+                "SELECT deal, strain, level, hcp, fit, lead_suit, fitness, genome FROM genomes"):
+            if exclude_self and row[0] == key:
+                continue
+            other = {'strain': row[1], 'level': row[2], 'hcp': row[3], 'fit': row[4], 'lead_suit': row[5]}
+            candidates.append((feature_distance(features, other), -row[6], row[7]))
+
+        candidates.sort(key=lambda x: (x[0], x[1]))
+        return [json.loads(genome) for _, _, genome in candidates[:k]]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM genomes").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
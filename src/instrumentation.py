@@ -0,0 +1,175 @@
+"""Optional hot-path instrumentation: call counters, cumulative timers and cache hit rates.
+
+Nothing is instrumented until enable() is called. It swaps the hot functions
+for timed wrappers and disable() puts the originals back, so while
+instrumentation is off the hooks cost nothing. Caches report through
+record_cache(), which is a single global check when off.
+
+    with profiled('run'):          # writes run.txt and run.collapsed
+        genetic_algorithm(...)
+
+run.collapsed is in the collapsed-stack format read by flamegraph.pl and
+speedscope (one "a;b;c <microseconds>" line per stack).
+"""
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+PROFILER = None
+
+
+class Profiler:
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.total = defaultdict(float)
+        self.self_time = defaultdict(float)  # collapsed stack -> seconds spent in its top frame
+        self.caches = defaultdict(lambda: [0, 0])  # name -> [hits, misses]
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            stack = getattr(self.local, 'stack', None)
+            if stack is None:
+                stack = self.local.stack = []
+            frame = [name, 0.0]  # name, time spent in children
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                path = ';'.join(f[0] for f in stack) + (';' if stack else '') + name
+                with self.lock:
+                    self.calls[name] += 1
+                    # Recursive frames would otherwise be counted twice
+                    if not any(f[0] == name for f in stack):
+                        self.total[name] += elapsed
+                    self.self_time[path] += elapsed - frame[1]
+
+        # Named after fn, so pickle sends the wrapper to pool workers by
+        # reference: they look up the module attribute, which is the wrapper
+        # once enable() has run (only the parent's calls are timed)
+        timed.__wrapped__ = fn
+        timed.__name__ = getattr(fn, '__name__', name)
+        timed.__qualname__ = getattr(fn, '__qualname__', timed.__name__)
+        timed.__module__ = getattr(fn, '__module__', None)
+        timed.__doc__ = getattr(fn, '__doc__', None)
+        return timed
+
+    def cache_event(self, name, hit):
+        with self.lock:
+            self.caches[name][0 if hit else 1] += 1
+
+    def report(self):
+        wall = time.perf_counter() - self.started
+        lines = [f"Instrumented run: {wall:.2f} s wall time", "",
+                 f"{'Function':40s} {'Calls':>10s} {'Total (s)':>10s} {'Mean (us)':>10s} {'% wall':>7s}"]
+        for name in sorted(self.total, key=self.total.get, reverse=True):
+            calls, total = self.calls[name], self.total[name]
+            lines.append(f"{name:40s} {calls:10d} {total:10.3f} {total / calls * 1e6:10.1f} "
+                         f"{total / wall * 100 if wall else 0:6.1f}%")
+
+        if self.caches:
+            lines += ["", f"{'Cache':40s} {'Hits':>10s} {'Misses':>10s} {'Hit rate':>10s}"]
+            for name, (hits, misses) in sorted(self.caches.items()):
+                rate = hits / (hits + misses) if hits + misses else 0
+                lines.append(f"{name:40s} {hits:10d} {misses:10d} {rate:10.1%}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        return "\n".join(f"{path} {round(seconds * 1e6)}"
+                         for path, seconds in sorted(self.self_time.items()))
+
+
+def _hooks():
+    """(owner, attribute, report name) of every instrumented function"""
+    from src import simulation, declarer, defenders
+
+    hooks = [
+        (simulation, 'simulate_game', 'simulate_game'),
+        (simulation, 'play_single_trick', 'play_single_trick'),
+        (declarer.DeclarerStrategy, 'choose_card', 'DeclarerStrategy.choose_card'),
+        (defenders.OptimalDefense, 'choose_defensive_card', 'OptimalDefense.choose_defensive_card'),
+        (defenders.TabulatedDefense, 'choose_defensive_card', 'TabulatedDefense.choose_defensive_card'),
+        (declarer, 'genetic_algorithm', 'genetic_algorithm'),
+        (declarer, 'evaluate_fitness', 'ga.evaluate_fitness'),
+        (declarer, 'breed', 'ga.breed'),
+    ]
+
+    # Modules that imported a hooked function by name need their own binding swapped
+    expanded = []
+    for owner, attribute, name in hooks:
+        expanded.append((owner, attribute, name))
+        if isinstance(owner, type):
+            continue
+        original = getattr(owner, attribute)
+        for module_name, module in list(sys.modules.items()):
+            if module is owner or module is None:
+                continue
+            if not (module_name.startswith(('src.', 'utils.')) or module_name in ('main', '__main__')):
+                continue
+            if getattr(module, attribute, None) is original:
+                expanded.append((module, attribute, name))
+    return expanded
+
+
+_patched = []
+
+
+def enable():
+    """Start a new Profiler and install the timed wrappers"""
+    global PROFILER
+    if PROFILER is not None:
+        return PROFILER
+
+    PROFILER = Profiler()
+    wrappers = {}  # every binding of a function gets the same wrapper, the one pickle finds
+    for owner, attribute, name in _hooks():
+        raw = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        if isinstance(raw, staticmethod):
+            replacement = staticmethod(PROFILER.wrap(name, raw.__func__))
+        else:
+            if raw not in wrappers:
+                wrappers[raw] = PROFILER.wrap(name, raw)
+            replacement = wrappers[raw]
+        _patched.append((owner, attribute, raw))
+        setattr(owner, attribute, replacement)
+    return PROFILER
+
+
+def disable():
+    """Restore the original functions and return the finished Profiler"""
+    global PROFILER
+    for owner, attribute, raw in reversed(_patched):
+        setattr(owner, attribute, raw)
+    _patched.clear()
+    profiler, PROFILER = PROFILER, None
+    return profiler
+
+
+def record_cache(name, hit):
+    if PROFILER is not None:
+        PROFILER.cache_event(name, hit)
+
+
+@contextmanager
+def profiled(prefix=None):
+    """Instrument the block; with a prefix, write <prefix>.txt and <prefix>.collapsed"""
+    profiler = enable()
+    try:
+        yield profiler
+    finally:
+        disable()
+        if prefix:
+            with open(prefix + '.txt', 'w') as f:
+                f.write(profiler.report() + "\n")
+            with open(prefix + '.collapsed', 'w') as f:
+                f.write(profiler.collapsed() + "\n")
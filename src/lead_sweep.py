@@ -0,0 +1,112 @@
+"""Opening-lead sweep: declarer's result for every distinct opening lead.
+
+    python -m src.lead_sweep utils/deals/3C.json [--population 40] [--generations 70] [--workers N]
+
+Leads that are equivalent by rank (cards of one suit with no other player's
+card between them, such as KQ) are solved once. One population is evolved on
+the deal's own lead; every other lead then warm-starts from that population
+with a much shorter run, and these runs go in parallel on a process pool.
+"""
+import argparse
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Game_Engine import load_deal, pack_deal, unpack_deal
+from src.simulation import simulate_game
+from src.declarer import evolve, genetic_algorithm
+
+
+def distinct_leads(hands, lead_player):
+    """Groups of rank-equivalent cards in the leader's hand, highest card first in each group"""
+    hand = hands[lead_player]
+    others = {(c.suit, c.rank_value) for p, cards in hands.items() if p != lead_player for c in cards}
+    groups = []
+
+    for suit in sorted({c.suit for c in hand}, key=lambda s: 'SHDC'.index(s)):
+        cards = sorted((c for c in hand if c.suit == suit), key=lambda c: c.rank_value, reverse=True)
+        group = [cards[0]]
+        for card in cards[1:]:
+            # Equivalent to the previous card if no other player holds a rank in between
+            between = range(card.rank_value + 1, group[-1].rank_value)
+            if any((suit, rank) in others for rank in between):
+                groups.append(group)
+                group = [card]
+            else:
+                group.append(card)
+        groups.append(group)
+
+    return groups
+
+
+def _solve_lead(packed_deal, genomes, population_size, generations):
+    deal = unpack_deal(packed_deal)
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, population_size=population_size, generations=generations,
+                                 initial_genomes=genomes)
+    made_contract, tricks, _ = simulate_game(*deal, best)
+    return tricks, best.fitness
+
+
+def lead_sweep(hands, declarer, trump, contract_level, lead_card, lead_player,
+               population_size=40, generations=70, sweep_generations=None, workers=None):
+    """Declarer tricks for every distinct opening lead, as a list of table rows"""
+    sweep_generations = sweep_generations or max(5, generations // 4)
+    groups = distinct_leads(hands, lead_player)
+
+    # Evolve the shared population once, on the deal's own lead
+    snapshot = None
+    for snapshot in evolve(hands, declarer, trump, contract_level, lead_card, lead_player,
+                           population_size, generations):
+        pass
+    shared_genomes = [s.genome for s in snapshot['population']]
+    _, base_tricks, _ = simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player,
+                                      snapshot['best'])
+
+    rows = []
+    jobs = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for group in groups:
+            if lead_card in group:
+                rows.append({'lead': lead_card, 'equivalent': group, 'tricks': base_tricks,
+                             'fitness': snapshot['fitness']})
+                continue
+            packed = pack_deal(hands, declarer, trump, contract_level, group[0], lead_player)
+            jobs.append((group, pool.submit(_solve_lead, packed, shared_genomes,
+                                            population_size, sweep_generations)))
+
+        for group, future in jobs:
+            tricks, fitness = future.result()
+            rows.append({'lead': group[0], 'equivalent': group, 'tricks': tricks, 'fitness': fitness})
+
+    needed = 6 + contract_level
+    for row in rows:
+        row['made'] = row['tricks'] >= needed
+    rows.sort(key=lambda r: ('SHDC'.index(r['lead'].suit), -r['lead'].rank_value))
+    return rows
+
+
+def print_table(rows, contract_level, trump, declarer):
+    print(f"Contract: {contract_level}{trump} by {declarer}")
+    print(f"{'Lead':6s} {'Equivalent':16s} {'Tricks':>6s}  Result")
+    print("-" * 40)
+    for row in rows:
+        equivalent = " ".join(str(c) for c in row['equivalent'])
+        print(f"{str(row['lead']):6s} {equivalent:16s} {row['tricks']:6d}  {'MADE' if row['made'] else 'DOWN'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Declarer's result for every distinct opening lead")
+    parser.add_argument('deal_file')
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--generations', type=int, default=70)
+    parser.add_argument('--sweep-generations', type=int,
+                        help="generations per warm-started lead (default: a quarter of --generations)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    deal = load_deal(args.deal_file)
+    rows = lead_sweep(*deal, population_size=args.population, generations=args.generations,
+                      sweep_generations=args.sweep_generations, workers=args.workers)
+    print_table(rows, deal[3], deal[2], deal[1])
@@ -0,0 +1,267 @@
+"""CMA-ES and differential evolution as drop-in alternatives to the GA.
+
+    python -m src.optimizers utils/deals/3C.json --target 9 [--optimizers ga cma de]
+                             [--population 20] [--generations 70] [--workers N]
+
+Both are generators taking evolve()'s deal and run arguments and yielding its
+snapshots, so whatever drives evolve (genetic_algorithm, main.py --optimizer)
+drives them too. Candidates are still DeclarerStrategy genomes scored by the same
+fitness function through the evaluator; only the update steps differ, and
+those run as NumPy array operations. The command line races the optimizers on
+one deal: each one's best strategy is replayed after every generation until
+it takes --target tricks, and the evaluations and time that took are reported.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from src.Game_Engine import load_deal
+from src.simulation import simulate_game
+from src.declarer import (DeclarerStrategy, FITNESS_RUNS, evolve, fitness_function, has_converged)
+from src.evaluation import SerialEvaluator
+from src.single_dummy import sample_layouts
+from src.telemetry import TelemetryWriter
+
+
+GENOME_SIZE = 60
+
+
+class CMAES:
+    """(mu/mu_w, lambda)-CMA-ES maximising fitness, after Hansen's tutorial defaults"""
+
+    def __init__(self, mean, sigma, population_size, rng):
+        n = len(mean)
+        self.rng = rng
+        self.mean = np.array(mean, dtype=float)
+        self.sigma = sigma
+        self.population_size = population_size or 4 + int(3 * math.log(n))
+        self.mu = self.population_size // 2
+
+        weights = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.C = np.eye(n)
+        self.inv_sqrt_C = np.eye(n)
+        self.generation = 0
+
+    def ask(self):
+        """population_size x n candidate genomes, clipped to the genes' [-1, 1] range"""
+        z = self.rng.standard_normal((self.population_size, len(self.mean)))
+        self.samples = self.mean + self.sigma * (z * self.D) @ self.B.T
+        return np.clip(self.samples, -1, 1)
+
+    def tell(self, fitness):
+        n = len(self.mean)
+        selected = self.samples[np.argsort(-fitness)[:self.mu]]
+        old_mean = self.mean
+        self.mean = self.weights @ selected
+        step = (self.mean - old_mean) / self.sigma
+
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * self.inv_sqrt_C @ step
+        self.generation += 1
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+
+        steps = (selected - old_mean) / self.sigma
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * (steps.T * self.weights) @ steps)
+        self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        self.inv_sqrt_C = (self.B / self.D) @ self.B.T
+
+
+class DifferentialEvolution:
+    """DE/rand/1/bin: every member competes against one mutated, crossed-over trial a generation"""
+
+    def __init__(self, population, scale, crossover_rate, rng):
+        self.rng = rng
+        self.population = np.array(population, dtype=float)
+        self.fitness = None
+        self.scale = scale
+        self.crossover_rate = crossover_rate
+
+    def ask(self):
+        """The trials to evaluate; the initial population itself on the first call"""
+        if self.fitness is None:
+            return self.population
+        size, n = self.population.shape
+        # Three distinct donors per member, none of them the member itself
+        donors = np.argsort(self.rng.random((size, size - 1)), axis=1)[:, :3]
+        donors += donors >= np.arange(size)[:, None]
+        a, b, c = (self.population[donors[:, k]] for k in range(3))
+        mutants = a + self.scale * (b - c)
+
+        cross = self.rng.random((size, n)) < self.crossover_rate
+        cross[np.arange(size), self.rng.integers(n, size=size)] = True
+        return np.clip(np.where(cross, mutants, self.population), -1, 1)
+
+    def tell(self, trials, fitness):
+        if self.fitness is None:
+            self.fitness = fitness
+            return
+        better = fitness >= self.fitness
+        self.population[better] = trials[better]
+        self.fitness = np.where(better, fitness, self.fitness)
+
+
+def _run(step, deal, generations, evaluator, telemetry, defense, endgame, single_dummy):
+    """Shared generation loop: step(genomes or None, fitness) proposes the next genomes to score
+
+    Yields evolve()'s snapshots, with the same keys; 'best' is the fittest
+    strategy seen so far, 'population' the strategies scored this generation,
+    best first, and every generation is played in full.
+    """
+    evaluator = evaluator or SerialEvaluator()
+    fitness_fn = fitness_function(defense, endgame)
+    stats_writer = TelemetryWriter(telemetry)
+    deals = [deal]
+    best = None
+    best_fitness_history = []
+
+    try:
+        genomes = step(None, None)
+        for generation in range(generations):
+            if single_dummy:
+                deals = sample_layouts(deal, single_dummy)
+            population = [DeclarerStrategy(genome=genome) for genome in genomes.tolist()]
+            evaluation_start = time.perf_counter()
+            evaluator.evaluate(population, deals, fitness_fn)
+            evaluation_time = time.perf_counter() - evaluation_start
+            fitness = np.array([strategy.fitness for strategy in population])
+
+            ranked = sorted(population, key=lambda x: x.fitness, reverse=True)
+            if best is None or ranked[0].fitness > best.fitness:
+                best = ranked[0]
+            best_fitness_history.append(best.fitness)
+            stats = stats_writer.record(generation, ranked, len(population) * len(deals) * FITNESS_RUNS,
+                                        evaluation_time)
+            converged = has_converged(best_fitness_history)
+
+            yield {
+                'generation': generation,
+                'best': best,
+                'fitness': best.fitness,
+                'population': ranked,
+                'mean': stats['mean'],
+                'stats': stats,
+                'fidelity': 'full',
+                'converged': converged,
+            }
+
+            if converged or generation == generations - 1:
+                break
+            genomes = step(genomes, fitness)
+    finally:
+        stats_writer.close()
+
+
+def evolve_cma(hands, declarer, trump, contract_level, lead_card, lead_player,
+               population_size=None, generations=70, initial_genomes=None, evaluator=None, telemetry=None,
+               defense=None, endgame=None, single_dummy=0, sigma=0.3, seed=None):
+    """CMA-ES over genomes, as an evolve()-compatible generator
+
+    The search starts from the mean of initial_genomes (the centre of the
+    gene range without them) with step size sigma. population_size defaults
+    to CMA-ES's own 4 + 3 ln(n).
+    """
+    start = np.mean(initial_genomes, axis=0) if initial_genomes else np.zeros(GENOME_SIZE)
+    cma = CMAES(start, sigma, population_size, np.random.default_rng(seed))
+
+    def step(genomes, fitness):
+        if fitness is not None:
+            cma.tell(fitness)
+        return cma.ask()
+
+    deal = (hands, declarer, trump, contract_level, lead_card, lead_player)
+    yield from _run(step, deal, generations, evaluator, telemetry, defense, endgame, single_dummy)
+
+
+def evolve_de(hands, declarer, trump, contract_level, lead_card, lead_player,
+              population_size=40, generations=70, initial_genomes=None, evaluator=None, telemetry=None,
+              defense=None, endgame=None, single_dummy=0, scale=0.5, crossover_rate=0.9, seed=None):
+    """Differential evolution over genomes, as an evolve()-compatible generator
+
+    initial_genomes seed part of the first population, the rest is uniform
+    over the gene range. scale is DE's F and crossover_rate its CR.
+    """
+    rng = np.random.default_rng(seed)
+    population = rng.uniform(-1, 1, (population_size, GENOME_SIZE))
+    seeds = (initial_genomes or [])[:population_size]
+    if seeds:
+        population[:len(seeds)] = seeds
+    de = DifferentialEvolution(population, scale, crossover_rate, rng)
+
+    def step(genomes, fitness):
+        if fitness is not None:
+            de.tell(genomes, fitness)
+        return de.ask()
+
+    deal = (hands, declarer, trump, contract_level, lead_card, lead_player)
+    yield from _run(step, deal, generations, evaluator, telemetry, defense, endgame, single_dummy)
+
+
+OPTIMIZERS = {'ga': evolve, 'cma': evolve_cma, 'de': evolve_de}
+
+
+def race(deal, target_tricks, names=('ga', 'cma', 'de'), population_size=20, generations=70, evaluator=None):
+    """Per optimizer: generations, fitness evaluations and seconds until its best takes target_tricks"""
+    results = {}
+    for name in names:
+        start_time = time.perf_counter()
+        evaluations = 0
+        result = {'reached': False, 'tricks': 0}
+        for snapshot in OPTIMIZERS[name](*deal, population_size=population_size, generations=generations,
+                                         evaluator=evaluator):
+            evaluations += snapshot['stats']['evaluations']
+            _, tricks, _ = simulate_game(*deal, snapshot['best'], record=False)
+            result.update(generation=snapshot['generation'], evaluations=evaluations,
+                          seconds=time.perf_counter() - start_time, tricks=max(result['tricks'], tricks))
+            if tricks >= target_tricks:
+                result['reached'] = True
+                break
+        results[name] = result
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Race the GA, CMA-ES and differential evolution on a deal")
+    parser.add_argument('deal_file')
+    parser.add_argument('--target', type=int, required=True, help="declarer tricks to reach")
+    parser.add_argument('--optimizers', nargs='+', choices=sorted(OPTIMIZERS), default=['ga', 'cma', 'de'])
+    parser.add_argument('--population', type=int, default=20)
+    parser.add_argument('--generations', type=int, default=70)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    evaluator = SerialEvaluator()
+    if args.workers > 1:
+        from src.shared_buffers import SharedMemoryEvaluator
+        evaluator = SharedMemoryEvaluator(args.workers)
+
+    with evaluator:
+        results = race(load_deal(args.deal_file), args.target, args.optimizers, args.population,
+                       args.generations, evaluator)
+
+    print(f"{'Optimizer':10s} {'Reached':>8s} {'Tricks':>7s} {'Gens':>5s} {'Evals':>7s} {'Time (s)':>9s}")
+    for name, result in results.items():
+        print(f"{name:10s} {'yes' if result['reached'] else 'no':>8s} {result['tricks']:7d} "
+              f"{result['generation'] + 1:5d} {result['evaluations']:7d} {result['seconds']:9.1f}")
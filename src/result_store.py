@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from src.Game_Engine import GameState, canonical_deal, card_code, parse_card
+from src.instrumentation import record_cache
+
+
+DEFAULT_STORE_PATH = 'utils/deals/results.db'
+
+
+def solver_config(population_size, generations, *, warm_start=False, endgame=None, single_dummy=0,
+                  surrogate=False, optimizer='ga', low_fidelity=0):
+    """The config a solve is stored under; settings left at the plain GA's defaults are omitted"""
+    config = {'population_size': population_size, 'generations': generations}
+    if warm_start:
+        config['warm_start'] = True
+    if endgame is not None:
+        config['endgame'] = [endgame.max_cards, endgame.rules]
+    if single_dummy:
+        config['single_dummy'] = single_dummy
+    if surrogate:
+        config['surrogate'] = True
+    if optimizer != 'ga':
+        config['optimizer'] = optimizer
+    if low_fidelity:
+        config['low_fidelity'] = low_fidelity
+    return config
+
+
+class ResultStore:
+    """Local SQLite store of solved deals, keyed by canonical deal and solver config"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        # Workers of src.work_queue share the file, so wait for their writes
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                deal TEXT NOT NULL,
+                config TEXT NOT NULL,
+                genome TEXT NOT NULL,
+                tricks INTEGER NOT NULL,
+                fitness REAL NOT NULL,
+                runtime REAL NOT NULL,
+                line TEXT NOT NULL,
+                created REAL NOT NULL
+            )""")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(deal, config):
+        """Hash of the canonical deal encoding plus the solver config"""
+        encoded = canonical_deal(*deal) + "#" + json.dumps(config, sort_keys=True)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, deal, config):
+        """Return the stored result for this deal and config, or None"""
+        row = self.conn.execute(
+            "SELECT genome, tricks, fitness, runtime, line FROM results WHERE key = ?",
+            (self.make_key(deal, config),)).fetchone()
+        record_cache('result_store', row is not None)
+        if row is None:
+            return None
+
+        genome, tricks, fitness, runtime, line = row
+        return {
+            'genome': json.loads(genome),
+            'tricks': tricks,
+            'fitness': fitness,
+            'runtime': runtime,
+            'line': json.loads(line),
+        }
+
+    def put(self, deal, config, strategy, tricks, runtime, trick_history):
+        """Store the outcome of a solve, replacing any previous entry"""
+        self.put_entry(deal, config, {
+            'genome': strategy.genome,
+            'tricks': tricks,
+            'fitness': strategy.fitness,
+            'runtime': runtime,
+            'line': encode_line(trick_history),
+        })
+
+    def put_entry(self, deal, config, entry):
+        """Store an entry shaped like the ones get() returns"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.make_key(deal, config), canonical_deal(*deal), json.dumps(config, sort_keys=True),
+             json.dumps(entry['genome']), entry['tricks'], entry['fitness'], entry['runtime'],
+             json.dumps(entry['line']), time.time()))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def encode_line(trick_history):
+    """trick_history as plain JSON data, cards written as deal-file codes"""
+    return [{'trick_num': trick['trick_num'],
+             'winner': trick['winner'],
+             'cards': [[player, card_code(card)] for player, card in trick['cards']]}
+            for trick in trick_history]
+
+
+def restore_state(deal, entry):
+    """Rebuild a finished GameState from a stored played line"""
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+    state = GameState({p: [] for p in hands}, declarer, trump, contract_level, lead_player)
+
+    for trick in entry['line']:
+        cards = [(player, parse_card(code)) for player, code in trick['cards']]
+        state.trick_history.append({'trick_num': trick['trick_num'],
+                                    'winner': trick['winner'],
+                                    'cards': cards})
+        state.cards_played.update(card for _, card in cards)
+        if state.is_declarer_side(trick['winner']):
+            state.declarer_tricks += 1
+        else:
+            state.defender_tricks += 1
+        state.current_leader = trick['winner']
+        state.tricks_played += 1
+
+    return state
@@ -0,0 +1,218 @@
+"""Difficulty-aware split of a fixed compute budget over a batch of deals (experimental).
+
+    python -m src.scheduler [--deals utils/deals] [--budget GAMES] [--population 40]
+                            [--patience 10] [--equal]
+
+The budget is counted in simulated fitness games, the unit the GA's cost
+scales with. By default it is what main.py spends on the batch: population
+40 for 70 generations on every deal. Scheduling has three steps:
+
+1. Probe: a short run with a small population on every deal. Its difficulty
+   is how much the best fitness still moved during the probe plus how spread
+   out the final population's fitness is. A deal that most strategies
+   play the same way scores low.
+2. Split: what is left of the budget is shared out in proportion to
+   difficulty, with every deal getting at least min_generations.
+3. Reallocate: a deal whose best score has not improved for patience
+   generations stops and hands its unspent budget back. The pool then goes
+   to the deals that were still improving when their own share ran out,
+   which continue from their last population. When no deal is improving any
+   more, what is left is shared by difficulty over all of them again.
+
+--equal spends the same budget split evenly, with no probe or reallocation,
+for comparison. Both print the games each deal actually used, never more
+than the budget.
+
+This is an experiment, not the batch strategy: main.py still gives every
+deal the same run. On the ten sample deals at population 20, the scheduler
+scored 1950, 2010 and 2080 on seeds 1-3, and the equal split 1960, 1980
+and 2010 from the same games. That is no consistent gain over the spread
+between seeds.
+"""
+import argparse
+import os
+import time
+
+from src.Game_Engine import load_deal
+from src.simulation import simulate_game
+from src.declarer import FITNESS_RUNS, evolve, score_result
+
+
+def games_per_generation(population_size):
+    """Fitness games of one generation plus the replay of its best strategy"""
+    return population_size * FITNESS_RUNS + 1
+
+
+class DealRun:
+    """One deal's share of the budget and its progress so far"""
+
+    def __init__(self, name, deal):
+        self.name = name
+        self.deal = deal
+        self.difficulty = 0.0
+        self.spent = 0
+        self.best = None
+        self.best_score = None
+        self.history = []
+        self.genomes = None
+        self.stalled = False
+
+    def improving(self, patience):
+        """The best score still rose over the last patience generations"""
+        if len(self.history) <= patience:
+            return True
+        return self.history[-1] > self.history[-1 - patience]
+
+    def offer(self, strategy):
+        """Keep the strategy if its replay scores better than the best so far
+
+        Fitness is noisy, so the best of many generations by fitness is
+        partly luck; one replayed game is exact and costs about 1% of a
+        generation.
+        """
+        made_contract, tricks, _ = simulate_game(*self.deal, strategy, record=False)
+        self.spent += 1
+        score = score_result(made_contract, tricks, self.deal[3])
+        if self.best_score is None or score > self.best_score:
+            self.best, self.best_score = strategy, score
+        self.history.append(self.best_score)
+
+    def advance(self, population_size, budget, patience, evaluator=None):
+        """Continue the GA from the last population until the budget is spent or the run stalls"""
+        generation_cost = games_per_generation(population_size)
+        generations = budget // generation_cost
+        if generations < 1:
+            return
+
+        for snapshot in evolve(*self.deal, population_size=population_size, generations=generations,
+                               initial_genomes=self.genomes, evaluator=evaluator):
+            self.spent += snapshot['stats']['evaluations']
+            self.offer(snapshot['best'])
+            self.genomes = [s.genome for s in snapshot['population']]
+            if not self.improving(patience):
+                self.stalled = True
+                break
+
+    def result(self):
+        made_contract, tricks, _ = simulate_game(*self.deal, self.best, record=False)
+        return tricks, score_result(made_contract, tricks, self.deal[3])
+
+
+def probe(run, population_size=16, generations=5, evaluator=None):
+    """Difficulty from a short run; the probe's population seeds the real run"""
+    first = snapshot = None
+    for snapshot in evolve(*run.deal, population_size=population_size, generations=generations,
+                           evaluator=evaluator):
+        first = first or snapshot
+        run.spent += snapshot['stats']['evaluations']
+    stats = snapshot['stats']
+    run.offer(snapshot['best'])
+    run.genomes = [s.genome for s in snapshot['population']]
+    run.difficulty = max(0.0, snapshot['fitness'] - first['fitness']) + (stats['p90'] - stats['p10'])
+    return run.difficulty
+
+
+def split(runs, budget, generation_cost, min_generations):
+    """Budgets proportional to difficulty, each at least min_generations generations
+
+    The shares never add up to more than budget: when it cannot pay every
+    run its min_generations, the floor shrinks to an equal share.
+    """
+    budget = max(0, budget)
+    floor = min(min_generations * generation_cost, budget // len(runs))
+    spare = budget - floor * len(runs)
+    total = sum(run.difficulty for run in runs)
+    return [floor + (spare * run.difficulty / total if total else spare / len(runs)) for run in runs]
+
+
+def schedule(deals, budget=None, population_size=40, patience=10, min_generations=5,
+             probe_population=16, probe_generations=5, evaluator=None):
+    """Solve a batch of (name, deal) within budget fitness games; the DealRuns, in batch order
+
+    budget is a hard cap. The probes get at most a quarter of it, with fewer
+    generations if need be, and none at all if a one-generation probe of
+    every deal does not fit; the deals are then split evenly.
+    """
+    generation_cost = games_per_generation(population_size)
+    budget = budget or len(deals) * 70 * generation_cost
+    runs = [DealRun(name, deal) for name, deal in deals]
+
+    probe_cost = len(runs) * games_per_generation(probe_population)
+    probe_generations = min(probe_generations, budget // 4 // probe_cost)
+    if probe_generations:
+        for run in runs:
+            probe(run, probe_population, probe_generations, evaluator)
+    remaining = budget - sum(run.spent for run in runs)
+
+    for run, share in zip(runs, split(runs, remaining, generation_cost, min_generations)):
+        run.advance(population_size, int(share), patience, evaluator)
+
+    # Budget handed back by stalled runs goes to the runs that were still
+    # improving; once none are, every run gets another go at a share of it
+    while True:
+        pool = budget - sum(run.spent for run in runs)
+        if pool < generation_cost:
+            break
+        hungry = [run for run in runs if not run.stalled and run.improving(patience)]
+        if not hungry:
+            hungry = runs
+            for run in runs:
+                run.stalled = False
+                run.history.clear()
+        before = sum(run.spent for run in runs)
+        for run, share in zip(hungry, split(hungry, pool, generation_cost, 0)):
+            run.advance(population_size, int(share), patience, evaluator)
+        if sum(run.spent for run in runs) == before:
+            break
+
+    return runs
+
+
+def equal_split(deals, budget=None, population_size=40, evaluator=None):
+    """The same budget spent in full, an equal share per deal
+
+    evolve() stops a converged run early, so the run is continued from its
+    last population until the deal's share is used up.
+    """
+    generation_cost = games_per_generation(population_size)
+    budget = budget or len(deals) * 70 * generation_cost
+    share = budget // len(deals)
+    runs = [DealRun(name, deal) for name, deal in deals]
+    for run in runs:
+        while share - run.spent >= generation_cost:
+            spent = run.spent
+            # patience past the share: the scheduler's stall check never fires
+            run.advance(population_size, share - run.spent, share, evaluator)
+            if run.spent == spent:
+                break
+    return runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a batch of deals within one compute budget")
+    parser.add_argument('--deals', default='utils/deals')
+    parser.add_argument('--budget', type=int, help="fitness games for the whole batch "
+                                                   "(default: 70 generations of --population per deal)")
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--patience', type=int, default=10,
+                        help="generations without improvement before a deal gives its budget back")
+    parser.add_argument('--equal', action='store_true', help="split the budget evenly instead")
+    args = parser.parse_args()
+
+    files = sorted(f for f in os.listdir(args.deals) if f.endswith('.json'))
+    deals = [(f[:-len('.json')], load_deal(os.path.join(args.deals, f))) for f in files]
+
+    start_time = time.time()
+    if args.equal:
+        runs = equal_split(deals, args.budget, args.population)
+    else:
+        runs = schedule(deals, args.budget, args.population, args.patience)
+    elapsed = time.time() - start_time
+
+    print(f"{'Deal':8s} {'Difficulty':>10s} {'Games':>8s} {'Tricks':>7s} {'Score':>6s}")
+    total_score = 0
+    for run in runs:
+        tricks, score = run.result()
+        total_score += score
+        print(f"{run.name:8s} {run.difficulty:10.1f} {run.spent:8d} {tricks:7d} {score:6d}")
+    print(f"Total score {total_score} from {sum(run.spent for run in runs)} games in {elapsed:.1f} s")
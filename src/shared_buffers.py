@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import random
+import struct
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from src.Game_Engine import PACKED_DEAL_SIZE, pack_deal, unpack_deal
+from src.declarer import DeclarerStrategy
+from src.endgame import flush_open_tables
+from src.evaluation import SerialEvaluator
+
+
+DEAL_HEADER = struct.Struct('qq')  # deal version, number of deals
+FLOAT_SIZE = 8
+
+
+class SharedPopulationBuffers:
+    """Packed deals, the population genome matrix and the fitness vector in shared memory
+
+    The owner creates the blocks; workers attach to them by name. Genomes are
+    stored row-major as float64, one row per strategy.
+    """
+
+    def __init__(self, population_size, genome_size, max_deals=64, names=None):
+        self.population_size = population_size
+        self.genome_size = genome_size
+        self.max_deals = max_deals
+        self.owner = names is None
+
+        if self.owner:
+            self.deal_shm = shared_memory.SharedMemory(
+                create=True, size=DEAL_HEADER.size + max_deals * PACKED_DEAL_SIZE)
+            self.genome_shm = shared_memory.SharedMemory(
+                create=True, size=population_size * genome_size * FLOAT_SIZE)
+            self.fitness_shm = shared_memory.SharedMemory(
+                create=True, size=population_size * FLOAT_SIZE)
+            DEAL_HEADER.pack_into(self.deal_shm.buf, 0, 0, 0)
+        else:
+            self.deal_shm, self.genome_shm, self.fitness_shm = (
+                shared_memory.SharedMemory(name=name) for name in names)
+
+        self.fitness = self.fitness_shm.buf.cast('d')
+
+    @property
+    def names(self):
+        return self.deal_shm.name, self.genome_shm.name, self.fitness_shm.name
+
+    def deal_version(self):
+        return DEAL_HEADER.unpack_from(self.deal_shm.buf, 0)[0]
+
+    def write_deals(self, packed_deals):
+        """Copy packed deals into the shared block and bump the version workers check"""
+        if len(packed_deals) > self.max_deals:
+            raise ValueError(f"At most {self.max_deals} deals fit in the shared buffer, got {len(packed_deals)}")
+        for i, packed in enumerate(packed_deals):
+            offset = DEAL_HEADER.size + i * PACKED_DEAL_SIZE
+            self.deal_shm.buf[offset:offset + PACKED_DEAL_SIZE] = packed
+        DEAL_HEADER.pack_into(self.deal_shm.buf, 0, self.deal_version() + 1, len(packed_deals))
+
+    def read_deals(self):
+        version, count = DEAL_HEADER.unpack_from(self.deal_shm.buf, 0)
+        deals = []
+        for i in range(count):
+            offset = DEAL_HEADER.size + i * PACKED_DEAL_SIZE
+            deals.append(unpack_deal(bytes(self.deal_shm.buf[offset:offset + PACKED_DEAL_SIZE])))
+        return version, deals
+
+    def write_genome(self, index, genome):
+        struct.pack_into(f'{self.genome_size}d', self.genome_shm.buf,
+                         index * self.genome_size * FLOAT_SIZE, *genome)
+
+    def read_genome(self, index):
+        return list(struct.unpack_from(f'{self.genome_size}d', self.genome_shm.buf,
+                                       index * self.genome_size * FLOAT_SIZE))
+
+    def close(self):
+        # The view must be released before the blocks can be closed
+        self.fitness.release()
+        for shm in (self.deal_shm, self.genome_shm, self.fitness_shm):
+            shm.close()
+            if self.owner:
+                shm.unlink()
+
+
+# Worker-side state, set up once per process by _attach
+_worker = {}
+
+
+def _attach(names, population_size, genome_size, max_deals):
+    random.seed()  # fresh module generator; declarer drops its per-thread one at fork
+    _worker['buffers'] = SharedPopulationBuffers(population_size, genome_size, max_deals, names)
+    _worker['version'] = -1
+
+
+def _evaluate_slice(start, stop, fitness_fn):
+    buffers = _worker['buffers']
+    if buffers.deal_version() != _worker['version']:
+        _worker['version'], _worker['deals'] = buffers.read_deals()
+    deals = _worker['deals']
+
+    for i in range(start, stop):
+        strategy = DeclarerStrategy(genome=buffers.read_genome(i))
+        buffers.fitness[i] = sum(fitness_fn(strategy, deal) for deal in deals) / len(deals)
+    # Worker processes end without running exit handlers, so store new endgame positions now
+    flush_open_tables()
+
+
+class SharedMemoryEvaluator(SerialEvaluator):
+    """Evaluate a population on a process pool without pickling deals or strategies
+
+    Each generation the parent writes genomes into the shared matrix and sends
+    only (start, stop, fitness_fn) to the workers, which write fitness in place.
+    Deals are packed into shared memory once and re-read only when they change.
+    """
+
+    def __init__(self, workers=None, max_deals=64):
+        self.workers = workers or os.cpu_count()
+        self.max_deals = max_deals
+        self.buffers = None
+        self.pool = None
+        self.current_deals = None
+
+    def _ensure_capacity(self, population_size, genome_size):
+        if (self.buffers is not None and population_size <= self.buffers.population_size
+                and genome_size == self.buffers.genome_size):
+            return
+
+        self.close()
+        self.buffers = SharedPopulationBuffers(population_size, genome_size, self.max_deals)
+        # fork keeps start-up cheap; platforms without it fall back to their default
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_attach,
+            initargs=(self.buffers.names, population_size, genome_size, self.max_deals))
+        self.current_deals = None
+
+    def evaluate(self, population, deals, fitness_fn):
+        self._ensure_capacity(len(population), len(population[0].genome))
+
+        packed_deals = [pack_deal(*deal) for deal in deals]
+        if packed_deals != self.current_deals:
+            self.buffers.write_deals(packed_deals)
+            self.current_deals = packed_deals
+
+        for i, strategy in enumerate(population):
+            self.buffers.write_genome(i, strategy.genome)
+
+        # A couple of slices per worker keeps them busy when slices run unevenly
+        chunk = max(1, -(-len(population) // (self.workers * 2)))
+        futures = [self.pool.submit(_evaluate_slice, start, min(start + chunk, len(population)), fitness_fn)
+                   for start in range(0, len(population), chunk)]
+        wait(futures)
+        for future in futures:
+            future.result()  # re-raise worker errors
+
+        for i, strategy in enumerate(population):
+            strategy.fitness = self.buffers.fitness[i]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.buffers is not None:
+            self.buffers.close()
+            self.buffers = None
@@ -3,9 +3,18 @@ from src.Game_Engine import GameState, determine_trick_winner
 from src.defenders import OptimalDefense
 
 
-def simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player, strategy):
-    """Simulate a complete game with optimal defense"""
-    state = GameState(hands, declarer, trump, contract_level, lead_player)
+def simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player, strategy,
+                  defense=OptimalDefense, endgame=None, record=True):
+    """Simulate a complete game with optimal defense
+
+    defense is anything with OptimalDefense's choose_defensive_card, e.g. a
+    CachedDefense shared between games on the same deal. With an endgame
+    table the game stops once the remaining position is small enough and the
+    last tricks are scored from the table (they are not in trick_history).
+    record=False plays a lean game for fitness runs: only the trick counts
+    and the state's play array are kept, see GameState.rebuild_trick_history.
+    """
+    state = GameState(hands, declarer, trump, contract_level, lead_player, record)
 
     # Handle opening lead
     order = ["W", "N", "E", "S"]
@@ -14,10 +23,8 @@ def simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player
 
     # Play opening lead card
     if lead_card in state.hands[lead_player]:
-        state.hands[lead_player].remove(lead_card)
-        state.cards_played.add(lead_card)
-        played_cards = [lead_card]
-        played_players = [lead_player]
+        state.play_card(lead_player, lead_card)
+        trick = [(lead_card, lead_player)]
         leading_suit = lead_card.suit
 
         # Complete first trick
@@ -26,39 +33,30 @@ def simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player
                 continue
 
             if state.is_declarer_side(player) and strategy:
-                card = strategy.choose_card(state, player, leading_suit,
-                                            list(zip(played_cards, played_players)))
+                card = strategy.choose_card(state, player, leading_suit, trick)
             else:
-                card = OptimalDefense.choose_defensive_card(state, player, leading_suit,
-                                                            list(zip(played_cards, played_players)))
+                card = defense.choose_defensive_card(state, player, leading_suit, trick)
 
             if card and card in state.hands[player]:
-                state.hands[player].remove(card)
-                state.cards_played.add(card)
-                played_cards.append(card)
-                played_players.append(player)
+                state.play_card(player, card)
+                trick.append((card, player))
 
         # Determine winner of first trick
-        if len(played_cards) == 4:
-            winner = determine_trick_winner(played_cards, played_players, state.NT, state.trump)
-            if state.is_declarer_side(winner):
-                state.declarer_tricks += 1
-            else:
-                state.defender_tricks += 1
-            state.current_leader = winner
-            state.tricks_played += 1
-            state.trick_history.append({
-                'trick_num': 1,
-                'winner': winner,
-                'cards': list(zip(played_players, played_cards))
-            })
+        if len(trick) == 4:
+            winner = determine_trick_winner([c for c, _ in trick], [p for _, p in trick],
+                                            state.NT, state.trump)
+            state.record_trick(trick, winner)
 
     # Play remaining tricks
     for trick_num in range(2, 14):
         if not any(state.hands.values()):
             break
 
-        winner, trick_cards = play_single_trick(state, strategy)
+        if endgame is not None and endgame.covers(state):
+            endgame.finish(state)
+            break
+
+        winner, trick_cards = play_single_trick(state, strategy, defense)
         if not winner:
             break
 
@@ -66,14 +64,14 @@ def simulate_game(hands, declarer, trump, contract_level, lead_card, lead_player
     needed_tricks = 6 + contract_level
     return state.declarer_tricks >= needed_tricks, state.declarer_tricks, state
 
-def play_single_trick(state, declarer_strategy=None):
+def play_single_trick(state, declarer_strategy=None, defense=OptimalDefense):
     """Play one trick with optimal defense"""
     order = ["W", "N", "E", "S"]
     lead_index = order.index(state.current_leader)
     trick_order = order[lead_index:] + order[:lead_index]
 
-    played_cards = []
-    played_players = []
+    # (card, player) pairs, passed as the cards played so far to each player
+    trick = []
     leading_suit = None
 
     for i, player in enumerate(trick_order):
@@ -85,39 +83,22 @@ def play_single_trick(state, declarer_strategy=None):
             if state.is_declarer_side(player) and declarer_strategy:
                 card = declarer_strategy.choose_card(state, player, None, [])
             else:
-                card = OptimalDefense.choose_defensive_card(state, player, None, [])
+                card = defense.choose_defensive_card(state, player, None, [])
             leading_suit = card.suit if card else None
         else:
             # Following player
             if state.is_declarer_side(player) and declarer_strategy:
-                card = declarer_strategy.choose_card(state, player, leading_suit,
-                                                     list(zip(played_cards, played_players)))
+                card = declarer_strategy.choose_card(state, player, leading_suit, trick)
             else:
-                card = OptimalDefense.choose_defensive_card(state, player, leading_suit,
-                                                            list(zip(played_cards, played_players)))
+                card = defense.choose_defensive_card(state, player, leading_suit, trick)
 
         if card and card in state.hands[player]:
-            state.hands[player].remove(card)
-            state.cards_played.add(card)
-            played_cards.append(card)
-            played_players.append(player)
-
-    if len(played_cards) == 4:
-        winner = determine_trick_winner(played_cards, played_players, state.NT, state.trump)
-
-        if state.is_declarer_side(winner):
-            state.declarer_tricks += 1
-        else:
-            state.defender_tricks += 1
-
-        state.current_leader = winner
-        state.tricks_played += 1
-        state.trick_history.append({
-            'trick_num': state.tricks_played,
-            'winner': winner,
-            'cards': list(zip(played_players, played_cards))
-        })
+            state.play_card(player, card)
+            trick.append((card, player))
 
-        return winner, list(zip(played_players, played_cards))
+    if len(trick) == 4:
+        winner = determine_trick_winner([c for c, _ in trick], [p for _, p in trick], state.NT, state.trump)
+        state.record_trick(trick, winner)
+        return winner, [(p, c) for c, p in trick]
 
-    return None, []
\ No newline at end of file
+    return None, []
@@ -0,0 +1,34 @@
+import random
+
+from src.Game_Engine import SEATS
+
+
+def hidden_seats(declarer):
+    """The defenders, whose cards declarer cannot see"""
+    seat = SEATS.index(declarer)
+    return SEATS[(seat + 1) % 4], SEATS[(seat + 3) % 4]
+
+
+def sample_layouts(deal, count, rng=random):
+    """count deals that look the same from declarer's seat
+
+    Declarer's and dummy's hands stay put, the opening lead stays with the
+    leader and the rest of the defenders' cards are shuffled between them,
+    keeping both hand lengths.
+    """
+    hands, declarer, trump, contract_level, lead_card, lead_player = deal
+    defenders = hidden_seats(declarer)
+    hidden = [card for seat in defenders for card in hands[seat] if card != lead_card]
+
+    layouts = []
+    for _ in range(count):
+        rng.shuffle(hidden)
+        layout = dict(hands)
+        start = 0
+        for seat in defenders:
+            size = len(hands[seat]) - (seat == lead_player)
+            layout[seat] = hidden[start:start + size]
+            start += size
+        layout[lead_player] = [lead_card] + layout[lead_player]
+        layouts.append((layout, declarer, trump, contract_level, lead_card, lead_player))
+    return layouts
@@ -0,0 +1,240 @@
+"""Local asyncio solve service around load_deal, genetic_algorithm and simulate_game.
+
+    python -m src.solve_service --port 8765            # HTTP on localhost
+    python -m src.solve_service --unix /tmp/bridge.sock
+
+POST /solve with a JSON body {"deal": <deal-file JSON> | "deal_file": path,
+"population_size": 40, "generations": 70} returns the tricks, the played line
+and whether the answer came from the cache. GET /health reports queue and
+cache state.
+
+Solves run on a process pool that is started (and warmed) once. Identical
+requests that arrive while a solve is running share its result, finished
+results are cached by deal hash, and a bounded queue turns overload into
+503 responses instead of unbounded waiting.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Game_Engine import load_deal, parse_deal, pack_deal, unpack_deal
+from src.simulation import simulate_game
+from src.declarer import genetic_algorithm
+from src.result_store import ResultStore, encode_line
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _solve(packed_deal, population_size, generations):
+    """Worker side: evolve a strategy and replay the best line"""
+    deal = unpack_deal(packed_deal)
+    start_time = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, population_size=population_size, generations=generations)
+    made_contract, tricks, state = simulate_game(*deal, best)
+    return {
+        'genome': best.genome,
+        'tricks': tricks,
+        'fitness': best.fitness,
+        'runtime': time.time() - start_time,
+        'line': encode_line(state.trick_history),
+    }
+
+
+class SolveService:
+    def __init__(self, workers=None, queue_size=32, store_path=':memory:'):
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Room for one solve per worker plus queue_size waiting ones, so idle
+        # workers never cause a 503 before their consumers have woken up
+        self.queue = asyncio.Queue(maxsize=queue_size + self.workers)
+        self.store = ResultStore(store_path)
+        self.in_flight = {}
+        self.consumers = []
+        self.solved = 0
+
+    async def start(self):
+        # Fork every worker and import the engine now, not on the first request
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+        self.consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self.consumers:
+            task.cancel()
+        await asyncio.gather(*self.consumers, return_exceptions=True)
+        self.pool.shutdown()
+        self.store.close()
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            deal, config, future = await self.queue.get()
+            try:
+                entry = await loop.run_in_executor(
+                    self.pool, _solve, pack_deal(*deal), config['population_size'], config['generations'])
+                self.store.put_entry(deal, config, entry)
+                self.solved += 1
+                future.set_result(entry)
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                self.queue.task_done()
+
+    async def solve(self, deal, config):
+        """Result entry for a deal; raises asyncio.QueueFull when overloaded"""
+        cached = self.store.get(deal, config)
+        if cached is not None:
+            return cached, 'cache'
+
+        key = ResultStore.make_key(deal, config)
+        if key in self.in_flight:
+            return await asyncio.shield(self.in_flight[key]), 'in-flight'
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((deal, config, future))
+        self.in_flight[key] = future
+        try:
+            return await asyncio.shield(future), 'solved'
+        finally:
+            self.in_flight.pop(key, None)
+
+    def health(self):
+        return {
+            'workers': self.workers,
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue.maxsize - self.workers,
+            'in_flight': len(self.in_flight),
+            'solved': self.solved,
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+            if method == 'GET' and path == '/health':
+                status, payload = 200, self.health()
+            elif method == 'POST' and path == '/solve':
+                status, payload = await self.handle_solve(body)
+            else:
+                status, payload = 404, {'error': f"no route for {method} {path}"}
+        except asyncio.IncompleteReadError:
+            writer.close()
+            return
+        except (ValueError, KeyError, OSError) as exc:
+            status, payload = 400, {'error': str(exc)}
+        except Exception as exc:
+            status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+
+        await write_response(writer, status, payload)
+
+    async def handle_solve(self, body):
+        request = json.loads(body or b'{}')
+        if 'deal' in request:
+            deal = parse_deal(request['deal'])
+        elif 'deal_file' in request:
+            deal = load_deal(request['deal_file'])
+        else:
+            raise ValueError("request needs 'deal' or 'deal_file'")
+
+        config = {'population_size': int(request.get('population_size', 40)),
+                  'generations': int(request.get('generations', 70))}
+        try:
+            entry, source = await self.solve(deal, config)
+        except asyncio.QueueFull:
+            return 503, {'error': 'solve queue is full, retry later'}
+
+        contract_level = deal[3]
+        return 200, {
+            'contract': f"{contract_level}{deal[2]}",
+            'declarer': deal[1],
+            'tricks': entry['tricks'],
+            'made': entry['tricks'] >= 6 + contract_level,
+            'fitness': entry['fitness'],
+            'runtime': entry['runtime'],
+            'line': entry['line'],
+            'source': source,
+        }
+
+
+HTTP_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+async def read_request(reader):
+    """Minimal HTTP/1.1 request parser: request line, headers, Content-Length body"""
+    request_line = (await reader.readuntil(b'\r\n')).decode('latin-1').split()
+    if len(request_line) < 2:
+        raise ValueError("malformed request line")
+    headers = {}
+    while True:
+        line = (await reader.readuntil(b'\r\n')).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return request_line[0].upper(), request_line[1], body
+
+
+async def write_response(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def request(method, path, payload=None, host='127.0.0.1', port=8765, unix_path=None):
+    """Small client for the service; returns (status, decoded JSON body)"""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+async def serve(host='127.0.0.1', port=8765, unix_path=None, workers=None, queue_size=32,
+                store_path=':memory:'):
+    service = SolveService(workers, queue_size, store_path)
+    await service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+        print(f"Serving on unix:{unix_path} with {service.workers} workers")
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f"Serving on http://{host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local solve service with a warm worker pool")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--queue', type=int, default=32, help="maximum queued solves before 503")
+    parser.add_argument('--store', default=':memory:', help="SQLite result cache (default: in memory)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.queue, args.store))
@@ -0,0 +1,73 @@
+class RidgeSurrogate:
+    """Online ridge regression from genome to fitness, used to pre-screen children
+
+    Every evaluated (genome, fitness) pair updates the running sums X^T X and
+    X^T y, so training costs O(d^2) per sample however many have been seen,
+    and the weights are re-solved (O(d^3), d = genome size + 1) only when a
+    prediction is needed after new data. Pure Python: d is about 60.
+    evolve() adds every evaluated strategy, and breed() breeds oversample
+    times the children it needs and keeps the ones screen() ranks highest.
+    """
+
+    def __init__(self, alpha=1.0, min_samples=None):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self):
+        """Forget every sample, e.g. when the fitness being modelled changes"""
+        self.xtx = None
+        self.xty = None
+        self.samples = 0
+        self.weights = None
+
+    def add(self, genome, fitness):
+        x = [1.0] + list(genome)
+        if self.xtx is None:
+            self.xtx = [[0.0] * len(x) for _ in x]
+            self.xty = [0.0] * len(x)
+        for i, xi in enumerate(x):
+            row = self.xtx[i]
+            for j, xj in enumerate(x):
+                row[j] += xi * xj
+            self.xty[i] += xi * fitness
+        self.samples += 1
+        self.weights = None
+
+    def ready(self):
+        """Enough samples for the fit to beat picking children at random"""
+        if self.xtx is None:
+            return False
+        return self.samples >= (self.min_samples or len(self.xty))
+
+    def predict(self, genome):
+        if self.weights is None:
+            self.weights = self._fit()
+        return self.weights[0] + sum(w * g for w, g in zip(self.weights[1:], genome))
+
+    def _fit(self):
+        """Solve (X^T X + alpha I) w = X^T y by Gaussian elimination; the bias is not penalised"""
+        size = len(self.xty)
+        a = [row[:] + [self.xty[i]] for i, row in enumerate(self.xtx)]
+        for i in range(1, size):
+            a[i][i] += self.alpha
+
+        for col in range(size):
+            pivot = max(range(col, size), key=lambda r: abs(a[r][col]))
+            a[col], a[pivot] = a[pivot], a[col]
+            for r in range(col + 1, size):
+                factor = a[r][col] / a[col][col]
+                if factor:
+                    for c in range(col, size + 1):
+                        a[r][c] -= factor * a[col][c]
+
+        weights = [0.0] * size
+        for r in range(size - 1, -1, -1):
+            weights[r] = (a[r][size] - sum(a[r][c] * weights[c] for c in range(r + 1, size))) / a[r][r]
+        return weights
+
+    def screen(self, candidates, count):
+        """The count candidates with the best predicted fitness (the first count until ready)"""
+        if not self.ready():
+            return candidates[:count]
+        return sorted(candidates, key=lambda s: self.predict(s.genome), reverse=True)[:count]
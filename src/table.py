@@ -0,0 +1,101 @@
+"""Strain/declarer trick table: 4 declarers x 5 strains for one deal in one pass.
+
+    python -m src.table utils/deals/3C.json [--population 40] [--generations 70] [--workers N]
+
+The deal is parsed and packed once and sent to the workers as 64 bytes. The
+table is solved as 10 jobs, one per (strain, partnership), run in parallel.
+Inside a job both declarers of the partnership share one CachedDefense, so
+defensive decisions met by the first declarer's games are reused by the
+second, and the second declarer's run warm-starts from the first one's
+population with a shorter schedule. Each cell's opening lead is the one
+OptimalDefense picks for declarer's left-hand opponent.
+"""
+import argparse
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Game_Engine import GameState, SEATS, load_deal, pack_deal, unpack_deal
+from src.simulation import simulate_game
+from src.declarer import evolve
+from src.defenders import OptimalDefense, CachedDefense
+
+
+TABLE_STRAINS = ['NT', 'S', 'H', 'D', 'C']
+SIDES = [('N', 'S'), ('E', 'W')]
+
+
+def left_hand_opponent(declarer):
+    return SEATS[(SEATS.index(declarer) + 1) % 4]
+
+
+def opening_lead(hands, declarer, trump, defense=OptimalDefense):
+    """The opening lead the defense chooses against this declarer and strain"""
+    leader = left_hand_opponent(declarer)
+    state = GameState(hands, declarer, trump, 1, leader)
+    return defense.choose_defensive_card(state, leader, None, []), leader
+
+
+def _solve_side(packed_deal, trump, declarers, population_size, generations, follow_up_generations):
+    """Tricks for each declarer of one partnership in one strain"""
+    hands = unpack_deal(packed_deal)[0]
+    defense = CachedDefense()
+    genomes = None
+    results = {}
+
+    for i, declarer in enumerate(declarers):
+        lead_card, leader = opening_lead(hands, declarer, trump, defense)
+        deal = (hands, declarer, trump, 1, lead_card, leader)
+
+        snapshot = None
+        with contextlib.redirect_stdout(io.StringIO()):
+            for snapshot in evolve(*deal, population_size=population_size,
+                                   generations=generations if i == 0 else follow_up_generations,
+                                   initial_genomes=genomes, defense=defense):
+                pass
+        genomes = [s.genome for s in snapshot['population']]
+
+        _, tricks, _ = simulate_game(*deal, snapshot['best'], defense)
+        results[declarer] = {'tricks': tricks, 'lead': str(lead_card)}
+
+    return trump, results
+
+
+def trick_table(hands, population_size=40, generations=70, follow_up_generations=None, workers=None):
+    """{strain: {declarer: {'tricks': n, 'lead': card}}} for all 20 cells"""
+    follow_up_generations = follow_up_generations or max(5, generations // 2)
+    # Declarer, strain and lead are per cell; only the hands matter for the packed deal
+    any_card = hands['W'][0]
+    packed = pack_deal(hands, 'S', 'NT', 1, any_card, 'W')
+
+    table = {strain: {} for strain in TABLE_STRAINS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_solve_side, packed, strain, side, population_size, generations,
+                               follow_up_generations)
+                   for strain in TABLE_STRAINS for side in SIDES]
+        for future in futures:
+            strain, results = future.result()
+            table[strain].update(results)
+    return table
+
+
+def print_table(table):
+    print(f"{'':4s}" + "".join(f"{strain:>5s}" for strain in TABLE_STRAINS))
+    for declarer in "NSEW":
+        print(f"{declarer:4s}" + "".join(f"{table[strain][declarer]['tricks']:5d}" for strain in TABLE_STRAINS))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="4 declarers x 5 strains trick table for a deal")
+    parser.add_argument('deal_file')
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--generations', type=int, default=70)
+    parser.add_argument('--follow-up-generations', type=int,
+                        help="generations for the second declarer of a side (default: half)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    hands = load_deal(args.deal_file)[0]
+    print_table(trick_table(hands, args.population, args.generations, args.follow_up_generations,
+                            args.workers))
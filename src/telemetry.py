@@ -0,0 +1,82 @@
+import json
+import time
+
+from src import instrumentation
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an ascending list, q in [0, 100]"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q / 100.0
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+def genome_diversity(population):
+    """Mean per-gene standard deviation across the population"""
+    size = len(population)
+    total = 0.0
+    for genes in zip(*(s.genome for s in population)):
+        mean = sum(genes) / size
+        total += (sum((g - mean) ** 2 for g in genes) / size) ** 0.5
+    return total / len(population[0].genome)
+
+
+class TelemetryWriter:
+    """JSONL stream with one record per GA generation
+
+    Accepts a path or an open file; with None the records are only returned.
+    evaluations_per_s covers only the evaluation step the caller timed, not
+    breeding or the snapshot consumer; generation_time is the whole
+    generation. cache_hits, taken from the instrumentation profiler, is only
+    in the record while one is running.
+    """
+
+    def __init__(self, target=None):
+        self.owns_file = isinstance(target, str)
+        self.file = open(target, 'w') if self.owns_file else target
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.last_cache_hits = 0
+
+    def record(self, generation, population, evaluations, evaluation_time):
+        """Write the record for a generation; population must be sorted best first
+
+        evaluation_time is the seconds the evaluator took for the evaluations.
+        """
+        now = time.perf_counter()
+        elapsed = now - self.last
+        fitness = sorted(s.fitness for s in population)
+
+        record = {
+            'generation': generation,
+            'best': fitness[-1],
+            'mean': sum(fitness) / len(fitness),
+            'p10': percentile(fitness, 10),
+            'p50': percentile(fitness, 50),
+            'p90': percentile(fitness, 90),
+            'diversity': genome_diversity(population),
+            'evaluations': evaluations,
+            'evaluations_per_s': evaluations / evaluation_time if evaluation_time > 0 else 0.0,
+            'evaluation_time': evaluation_time,
+            'generation_time': elapsed,
+            'wall_time': now - self.started,
+        }
+        profiler = instrumentation.PROFILER
+        if profiler is not None:
+            cache_hits = sum(hits for hits, _ in profiler.caches.values())
+            # A profiler started mid-run counts from zero
+            record['cache_hits'] = max(0, cache_hits - self.last_cache_hits)
+            self.last_cache_hits = cache_hits
+        if self.file is not None:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+
+        self.last = now
+        return record
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
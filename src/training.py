@@ -0,0 +1,116 @@
+"""Corpus-level training of one general DeclarerStrategy.
+
+Instead of evolving a strategy per deal, fitness is the average score over a
+mini-batch of deals, resampled every generation. The trained strategy is then
+applied to any new deal with a single simulate_game call.
+
+    python -m src.training train --deals utils/deals --out strategy.json
+    python -m src.training apply --strategy strategy.json utils/deals/3C.json
+"""
+import argparse
+import json
+import os
+import random
+
+from src.Game_Engine import load_deal
+from src.simulation import simulate_game
+from src.declarer import DeclarerStrategy, breed, score_result
+from src.evaluation import SerialEvaluator
+
+
+def load_corpus(paths):
+    """Parse every deal once up front; paths may be deal files or directories of them"""
+    deals = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.json'))
+        else:
+            files = [path]
+        deals.extend(load_deal(f) for f in files)
+    return deals
+
+
+def game_score(strategy, deal):
+    """Score of one game on a deal, averaged over the batch by the evaluator"""
+    made_contract, tricks, _ = simulate_game(*deal, strategy, record=False)
+    return score_result(made_contract, tricks, deal[3])
+
+
+def train_on_corpus(deals, population_size=40, generations=70, batch_size=8, history=None,
+                    evaluator=None):
+    """Evolve one strategy whose fitness is its average result on sampled mini-batches"""
+    batch_size = min(batch_size, len(deals))
+    evaluator = evaluator or SerialEvaluator()
+    population = [DeclarerStrategy() for _ in range(population_size)]
+
+    print(f"Training on a corpus of {len(deals)} deals...")
+    print(f"Population: {population_size}, Generations: {generations}, Batch: {batch_size}\n")
+
+    for generation in range(generations):
+        # Fresh mini-batch every generation so elites are re-tested on new deals
+        batch = random.sample(deals, batch_size)
+        evaluator.evaluate(population, batch, game_score)
+
+        population.sort(key=lambda x: x.fitness, reverse=True)
+        if history is not None:
+            history.append(population[0].fitness)
+
+        if generation % 10 == 0 or generation == generations - 1:
+            avg_fitness = sum(s.fitness for s in population) / len(population)
+            print(f"Generation {generation:3d}: Best={population[0].fitness:6.1f}, Avg={avg_fitness:6.1f}")
+
+        if generation < generations - 1:
+            population = breed(population, population_size, generation, generations)
+
+    # The last batch is small, pick the final strategy on the whole corpus
+    elite = population[:max(1, population_size // 5)]
+    SerialEvaluator().evaluate(elite, deals, game_score)
+    return max(elite, key=lambda x: x.fitness)
+
+
+def apply_strategy(strategy, deal):
+    """Play a new deal with a trained strategy - a single simulate_game call"""
+    return simulate_game(*deal, strategy)
+
+
+def save_strategy(strategy, path):
+    with open(path, 'w') as f:
+        json.dump({'genome': strategy.genome, 'fitness': strategy.fitness}, f)
+
+
+def load_strategy(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    strategy = DeclarerStrategy(genome=data['genome'])
+    strategy.fitness = data['fitness']
+    return strategy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or apply a corpus-level declarer strategy")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train')
+    train.add_argument('--deals', nargs='+', default=['utils/deals'])
+    train.add_argument('--out', default='utils/deals/strategy.json')
+    train.add_argument('--population', type=int, default=40)
+    train.add_argument('--generations', type=int, default=70)
+    train.add_argument('--batch', type=int, default=8)
+
+    apply = commands.add_parser('apply')
+    apply.add_argument('--strategy', default='utils/deals/strategy.json')
+    apply.add_argument('deal_files', nargs='+')
+
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        best = train_on_corpus(load_corpus(args.deals), args.population, args.generations, args.batch)
+        save_strategy(best, args.out)
+        print(f"\nCorpus fitness {best.fitness:.2f}, strategy saved to {args.out}")
+    else:
+        strategy = load_strategy(args.strategy)
+        for deal_file in args.deal_files:
+            deal = load_deal(deal_file)
+            made_contract, tricks, _ = apply_strategy(strategy, deal)
+            print(f"{deal_file}: {deal[3]}{deal[2]} by {deal[1]} - {tricks} tricks, "
+                  f"{'MADE' if made_contract else 'DOWN'}")
@@ -0,0 +1,219 @@
+"""Batch solving from a work queue in a shared SQLite file.
+
+    python -m src.work_queue enqueue utils/deals [--queue utils/deals/results.db] [--population 40] [--generations 70]
+    python -m src.work_queue work [--queue utils/deals/results.db] [--workers 4] [--lease 600]
+    python -m src.work_queue status [--queue utils/deals/results.db]
+
+Any number of workers, on one machine or on several sharing the file, claim
+deals one at a time inside an IMMEDIATE transaction, so no deal is handed
+out twice. A claim is a lease that the worker renews while it solves; if the
+worker dies the lease runs out and the deal goes back to the queue. Results
+are written to the ResultStore table of the same database file.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from src.Game_Engine import load_deal, parse_deal, deal_to_json
+from src.simulation import simulate_game
+from src.declarer import genetic_algorithm
+from src.result_store import ResultStore, DEFAULT_STORE_PATH, encode_line, solver_config
+
+
+DEFAULT_QUEUE_PATH = DEFAULT_STORE_PATH
+MAX_ATTEMPTS = 3
+
+
+class WorkQueue:
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                deal TEXT NOT NULL,
+                config TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )""")
+
+    def enqueue(self, name, deal, config):
+        self.conn.execute("INSERT INTO jobs (name, deal, config) VALUES (?, ?, ?)",
+                          (name, json.dumps(deal_to_json(*deal)), json.dumps(config)))
+
+    def claim(self, worker, lease):
+        """Lease the next pending (or abandoned) job to this worker; None when there is none
+
+        An abandoned job that has used up its attempts is marked failed
+        instead: a deal that kills its worker would otherwise take down every
+        worker in turn.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("""
+                UPDATE jobs SET status = 'failed', lease_until = NULL,
+                                error = COALESCE(error, 'lease expired ' || attempts || ' times')
+                WHERE status = 'running' AND lease_until < ? AND attempts >= ?""", (now, MAX_ATTEMPTS))
+            row = self.conn.execute("""
+                SELECT id, name, deal, config FROM jobs
+                WHERE status = 'pending' OR (status = 'running' AND lease_until < ? AND attempts < ?)
+                ORDER BY id LIMIT 1""", (now, MAX_ATTEMPTS)).fetchone()
+            if row is not None:
+                self.conn.execute("""
+                    UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1
+                    WHERE id = ?""", (worker, now + lease, row[0]))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        job_id, name, deal, config = row
+        return {'id': job_id, 'name': name, 'deal': parse_deal(json.loads(deal)), 'config': json.loads(config)}
+
+    def renew(self, job_id, worker, lease):
+        """Extend a lease; False if the job is no longer this worker's"""
+        cursor = self.conn.execute("""
+            UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'""",
+                                   (time.time() + lease, job_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker):
+        self.conn.execute("UPDATE jobs SET status = 'done', lease_until = NULL WHERE id = ? AND worker = ?",
+                          (job_id, worker))
+
+    def fail(self, job_id, worker, error):
+        """Put the job back for another attempt, or mark it failed after MAX_ATTEMPTS"""
+        self.conn.execute("""
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                            lease_until = NULL, error = ?
+            WHERE id = ? AND worker = ?""", (MAX_ATTEMPTS, error, job_id, worker))
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+def solve(deal, config):
+    """Evolve a strategy for a deal and replay it, as a ResultStore entry"""
+    start_time = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, population_size=config['population_size'],
+                                 generations=config['generations'])
+    made_contract, tricks, state = simulate_game(*deal, best)
+    return {
+        'genome': best.genome,
+        'tricks': tricks,
+        'fitness': best.fitness,
+        'runtime': time.time() - start_time,
+        'line': encode_line(state.trick_history),
+    }
+
+
+def _keep_lease(path, job_id, worker, lease, stop):
+    """Heartbeat thread: renew the lease every third of its length until stopped"""
+    queue = WorkQueue(path)
+    try:
+        while not stop.wait(lease / 3):
+            if not queue.renew(job_id, worker, lease):
+                break
+    finally:
+        queue.close()
+
+
+def work(path=DEFAULT_QUEUE_PATH, lease=600, poll=5.0):
+    """Solve jobs until none are pending or running; returns the number solved here"""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(path)
+    store = ResultStore(path)
+    solved = 0
+
+    try:
+        while True:
+            job = queue.claim(worker, lease)
+            if job is None:
+                # Jobs still leased elsewhere may come back if their worker dies
+                if queue.counts().get('running'):
+                    time.sleep(poll)
+                    continue
+                break
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=_keep_lease, args=(path, job['id'], worker, lease, stop),
+                                         daemon=True)
+            heartbeat.start()
+            try:
+                entry = store.get(job['deal'], job['config']) or solve(job['deal'], job['config'])
+                store.put_entry(job['deal'], job['config'], entry)
+                queue.complete(job['id'], worker)
+                solved += 1
+                print(f"[{worker}] {job['name']}: {entry['tricks']} tricks")
+            except Exception as exc:
+                queue.fail(job['id'], worker, f"{type(exc).__name__}: {exc}")
+            finally:
+                stop.set()
+                heartbeat.join()
+    finally:
+        store.close()
+        queue.close()
+
+    return solved
+
+
+def run_workers(path=DEFAULT_QUEUE_PATH, workers=None, lease=600):
+    """N local worker processes, the stand-in for N machines sharing the queue file"""
+    processes = [multiprocessing.Process(target=work, args=(path, lease)) for _ in range(workers or os.cpu_count())]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch solving from a shared SQLite work queue")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help="add deal files (or directories of them)")
+    enqueue_parser.add_argument('paths', nargs='+')
+    enqueue_parser.add_argument('--population', type=int, default=40)
+    enqueue_parser.add_argument('--generations', type=int, default=70)
+
+    work_parser = commands.add_parser('work', help="solve queued deals")
+    work_parser.add_argument('--workers', type=int, default=1)
+    work_parser.add_argument('--lease', type=float, default=600, help="seconds before an unrenewed claim expires")
+
+    commands.add_parser('status', help="count jobs by status")
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        queue = WorkQueue(args.queue)
+        config = solver_config(args.population, args.generations)
+        for path in args.paths:
+            files = ([os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith('.json')]
+                     if os.path.isdir(path) else [path])
+            for deal_file in files:
+                queue.enqueue(os.path.basename(deal_file), load_deal(deal_file), config)
+        print(queue.counts())
+        queue.close()
+    elif args.command == 'work':
+        run_workers(args.queue, args.workers, args.lease)
+    else:
+        queue = WorkQueue(args.queue)
+        print(queue.counts())
+        queue.close()
@@ -0,0 +1,42 @@
+import random
+
+from src.Game_Engine import load_deal
+from src import evaluation
+from src.declarer import evolve
+from src.endgame import EndgameTable
+from src.shared_buffers import SharedMemoryEvaluator
+
+
+def test_pool_run_persists_endgame_positions(tmp_path):
+    path = str(tmp_path / 'endgame.db')
+    deal = load_deal('utils/deals/3C.json')
+    endgame = EndgameTable(path, max_cards=3)
+
+    random.seed(0)
+    with SharedMemoryEvaluator(workers=2) as evaluator:
+        for _ in evolve(*deal, population_size=10, generations=2, evaluator=evaluator, endgame=endgame):
+            pass
+    endgame.close()
+
+    # Positions are solved in the workers only; the parent never played a game
+    table = EndgameTable(path, max_cards=3)
+    assert len(table) > 0
+    table.close()
+
+
+def test_thread_pool_shares_one_table(tmp_path, monkeypatch):
+    # The threads run in parallel only without the GIL, so pretend it is off
+    monkeypatch.setattr(evaluation, 'gil_enabled', lambda: False)
+    path = str(tmp_path / 'endgame.db')
+    deal = load_deal('utils/deals/3C.json')
+    endgame = EndgameTable(path, max_cards=3)
+
+    random.seed(0)
+    with evaluation.ThreadPoolEvaluator(workers=4) as evaluator:
+        assert evaluator.pool is not None
+        for _ in evolve(*deal, population_size=10, generations=2, evaluator=evaluator, endgame=endgame):
+            pass
+
+    # Two threads may solve the same position, but it is stored once
+    assert 0 < len(endgame) <= endgame.solved
+    endgame.close()
@@ -0,0 +1,26 @@
+import random
+
+from src.Game_Engine import load_deal
+from src.scheduler import equal_split, schedule
+
+
+DEALS = [(name, load_deal(f'utils/deals/{name}.json')) for name in ('3C', '4H')]
+
+
+def test_schedule_stays_within_a_small_budget():
+    random.seed(0)
+    runs = schedule(DEALS, budget=600, population_size=10)
+    assert sum(run.spent for run in runs) <= 600
+    assert all(run.best is not None for run in runs)
+
+
+def test_schedule_without_room_for_a_probe():
+    random.seed(0)
+    runs = schedule(DEALS, budget=100, population_size=10)
+    assert sum(run.spent for run in runs) <= 100
+
+
+def test_equal_split_stays_within_budget():
+    random.seed(0)
+    runs = equal_split(DEALS, budget=600, population_size=10)
+    assert sum(run.spent for run in runs) <= 600
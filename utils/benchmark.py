@@ -0,0 +1,214 @@
+"""Benchmark suite for the engine, the strategies and GA throughput.
+
+Run from the repository root:
+    python -m utils.benchmark run --out utils/benchmarks/baseline.json
+    python -m utils.benchmark compare utils/benchmarks/baseline.json current.json --tolerance 0.1
+
+Every result is a rate (higher is better), so compare flags a metric as a
+regression when it drops by more than the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from src.Game_Engine import (load_deal, parse_deal, get_legal_cards, determine_trick_winner)
+from src.simulation import simulate_game
+from src.declarer import DeclarerStrategy, genetic_algorithm
+from src.defenders import OptimalDefense, TabulatedDefense
+from utils.deal_generator import generate_corpus
+
+
+def load_corpora(deals_dir, generated, seed):
+    """The utils/deals corpus plus a seeded generated one"""
+    files = sorted(f for f in os.listdir(deals_dir) if f.endswith('.json'))
+    return {
+        'deals': [load_deal(os.path.join(deals_dir, f)) for f in files],
+        'generated': [parse_deal(d) for d in generate_corpus(generated, seed)],
+    }
+
+
+def measure(fn, calls, repeat=3):
+    """Best rate over several repeats, in calls per second"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return calls / best
+
+
+def capture_decisions(deals, strategy):
+    """Record the arguments of every declarer and defender decision in a few games"""
+    declarer_calls, defender_calls = [], []
+    choose_card = strategy.choose_card
+    choose_defensive_card = OptimalDefense.choose_defensive_card
+
+    def record_declarer(state, player, leading_suit, trick):
+        declarer_calls.append((state.copy(), player, leading_suit, list(trick)))
+        return choose_card(state, player, leading_suit, trick)
+
+    def record_defender(state, player, leading_suit, trick):
+        defender_calls.append((state.copy(), player, leading_suit, list(trick)))
+        return choose_defensive_card(state, player, leading_suit, trick)
+
+    strategy.choose_card = record_declarer
+    OptimalDefense.choose_defensive_card = staticmethod(record_defender)
+    try:
+        for deal in deals:
+            simulate_game(*deal, strategy)
+    finally:
+        del strategy.choose_card
+        OptimalDefense.choose_defensive_card = staticmethod(choose_defensive_card)
+
+    return declarer_calls, defender_calls
+
+
+def bench_micro(deals, strategy, repeat):
+    declarer_calls, defender_calls = capture_decisions(deals, strategy)
+    all_calls = declarer_calls + defender_calls
+    legal_args = [(state.hands[player], leading_suit) for state, player, leading_suit, _ in all_calls]
+
+    tricks = []
+    for deal in deals:
+        state = simulate_game(*deal, strategy)[2]
+        for trick in state.trick_history:
+            tricks.append(([c for _, c in trick['cards']], [p for p, _ in trick['cards']],
+                           state.NT, state.trump))
+
+    def legal():
+        for hand, leading_suit in legal_args:
+            get_legal_cards(hand, leading_suit)
+
+    def winner():
+        for trick in tricks:
+            determine_trick_winner(*trick)
+
+    def declarer():
+        for call in declarer_calls:
+            strategy.choose_card(*call)
+
+    def defender():
+        for call in defender_calls:
+            OptimalDefense.choose_defensive_card(*call)
+
+    def tabulated_defender():
+        for call in defender_calls:
+            TabulatedDefense.choose_defensive_card(*call)
+
+    return {
+        'get_legal_cards': measure(legal, len(legal_args), repeat),
+        'determine_trick_winner': measure(winner, len(tricks), repeat),
+        'choose_card': measure(declarer, len(declarer_calls), repeat),
+        'choose_defensive_card': measure(defender, len(defender_calls), repeat),
+        'tabulated_choose_defensive_card': measure(tabulated_defender, len(defender_calls), repeat),
+    }
+
+
+def bench_games(deals, strategy, repeat):
+    def games():
+        for deal in deals:
+            simulate_game(*deal, strategy)
+
+    return measure(games, len(deals), repeat)
+
+
+def bench_ga(deal, population_size, generations):
+    history = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        genetic_algorithm(*deal, population_size=population_size, generations=generations,
+                          history=history)
+    return len(history) / (time.perf_counter() - start)
+
+
+def run(deals_dir, generated, seed, repeat, population_sizes, generations):
+    random.seed(seed)
+    corpora = load_corpora(deals_dir, generated, seed)
+    strategy = DeclarerStrategy()
+    results = {}
+
+    for name, deals in corpora.items():
+        for metric, rate in bench_micro(deals, strategy, repeat).items():
+            results[f"{name}/{metric}_per_s"] = rate
+        results[f"{name}/simulate_game_per_s"] = bench_games(deals, strategy, repeat)
+        print(f"{name}: {results[f'{name}/simulate_game_per_s']:.1f} games/s", file=sys.stderr)
+
+    for population_size in population_sizes:
+        random.seed(seed)
+        rate = bench_ga(corpora['deals'][0], population_size, generations)
+        results[f"genetic_algorithm/p{population_size}_generations_per_s"] = rate
+        print(f"GA population {population_size}: {rate:.2f} generations/s", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance):
+    """Print every metric against the baseline; returns the regressed metric names"""
+    regressions = []
+    print(f"{'Metric':60s} {'Baseline':>12s} {'Current':>12s} {'Change':>8s}")
+    for name, base in sorted(baseline['results'].items()):
+        if name not in current['results']:
+            print(f"{name:60s} {base:12.2f} {'missing':>12s}")
+            continue
+        value = current['results'][name]
+        change = value / base - 1
+        flag = ''
+        if change < -tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:60s} {base:12.2f} {value:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite for engine, strategies and GA throughput")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the suite and write a JSON baseline")
+    run_parser.add_argument('--out', required=True)
+    run_parser.add_argument('--deals', default='utils/deals')
+    run_parser.add_argument('--generated', type=int, default=20, help="size of the generated corpus")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--populations', type=int, nargs='+', default=[10, 20, 40])
+    run_parser.add_argument('--generations', type=int, default=5)
+
+    compare_parser = commands.add_parser('compare', help="flag regressions against a baseline")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.1,
+                                help="allowed relative slowdown, e.g. 0.1 for 10%%")
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run(args.deals, args.generated, args.seed, args.repeat, args.populations, args.generations)
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.out}", file=sys.stderr)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
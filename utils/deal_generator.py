@@ -63,13 +63,58 @@ def generate_data(ns_point_split, trump_colour, ns_trump_split, contract_level):
 
     return data
 
-# Example usage
-data = generate_data(
-    ns_point_split=(18, 15),
-    trump_colour='C',
-    ns_trump_split=(5, 4),
-    contract_level=7
-)
-
-with open('deals/7C.json', 'w') as file:
-    json.dump(data, file, indent=4)
+# Uniformly random deal for seeded test corpora; the contract goes to the
+# side with more points, in its longest combined suit
+def generate_random_deal(rng):
+    deck = full_deck()
+    rng.shuffle(deck)
+    hands = {'W': deck[0:13], 'N': deck[13:26], 'E': deck[26:39], 'S': deck[39:52]}
+
+    declarer = 'S' if count_points(hands['N'] + hands['S']) >= 20 else 'E'
+    partner = {'S': 'N', 'E': 'W'}[declarer]
+    our_cards = hands[declarer] + hands[partner]
+    trump = max(SUITS, key=lambda s: count_trumps(our_cards, s))
+    contract_level = rng.randint(1, 4)
+
+    lead_player = {'S': 'W', 'E': 'S'}[declarer]
+    return {
+        "declarer": declarer,
+        "trump": trump,
+        "contract_level": contract_level,
+        "lead": {
+            "card": rng.choice(hands[lead_player]),
+            "player": lead_player
+        },
+        "hands": hands,
+    }
+
+# Seeded corpus of random deals
+def generate_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [generate_random_deal(rng) for _ in range(count)]
+
+# Save a corpus as JSON lines (.jsonl) or as packed 64-byte deals (.bin)
+def save_corpus(deals, path):
+    if path.endswith('.bin'):
+        # Imported here so the script still runs on its own from utils/
+        from src.Game_Engine import pack_deal, parse_deal
+        with open(path, 'wb') as file:
+            for deal in deals:
+                file.write(pack_deal(*parse_deal(deal)))
+    else:
+        with open(path, 'w') as file:
+            for deal in deals:
+                file.write(json.dumps(deal) + "\n")
+
+
+if __name__ == "__main__":
+    # Example usage
+    data = generate_data(
+        ns_point_split=(18, 15),
+        trump_colour='C',
+        ns_trump_split=(5, 4),
+        contract_level=7
+    )
+
+    with open('deals/7C.json', 'w') as file:
+        json.dump(data, file, indent=4)
@@ -1,5 +1,14 @@
+import argparse
+import hashlib
 import json
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+PLAYERS = ["W", "N", "E", "S"]
+RANK_VALUE = {rank: value for value, rank in enumerate("23456789TJQKA", start=2)}
 
 
 def generate_opl_dat(data: dict) -> str:
@@ -12,8 +21,9 @@ def generate_opl_dat(data: dict) -> str:
     output.append(f'lead_player = "{data["lead"]["player"]}";')
     output.append("")
 
+    # Same order as the PLAYERS set in the models, which index hand positionally
     output.append("hand = [")
-    for player in ["N", "S", "E", "W"]:
+    for player in ["W", "N", "E", "S"]:
         cards = data["hands"][player]
         cards_str = "{" + ", ".join(f'"{card}"' for card in cards) + "}"
         output.append(f'  {cards_str}, // {player}')
@@ -22,14 +32,82 @@ def generate_opl_dat(data: dict) -> str:
     return "\n".join(output)
 
 
-def main(json_path: str, output_path: str = None) -> str:
+def feasible_plays(data: dict) -> tuple:
+    """Sparse (trick, position, player, card) plays, possible trick winners and fixed plays
+
+    Players only play their own cards, and each position in a trick belongs
+    to the seat that many places after the leader. Trick 1 is known up to the
+    followers' cards: the opening lead is fixed, followers who hold the led
+    suit must play it (a single card there is fixed too), and only cards that
+    beat the lead can win, which limits who can lead trick 2. Cards fixed in
+    trick 1 are left out of the later tricks.
+    """
+    hands = data["hands"]
+    trump = data["trump"]
+    lead_card = data["lead"]["card"]
+    lead_player = data["lead"]["player"]
+    lead_suit = lead_card[0]
+    owner = {card: player for player, cards in hands.items() for card in cards}
+
+    plays = [(1, 1, lead_player, lead_card)]
+    winners = [(1, lead_card)]
+    fixed = [(1, 1, lead_player, lead_card)]
+    for offset in range(1, 4):
+        player = PLAYERS[(PLAYERS.index(lead_player) + offset) % 4]
+        cards = [c for c in hands[player] if c[0] == lead_suit] or hands[player]
+        for card in cards:
+            plays.append((1, offset + 1, player, card))
+            if card[0] == lead_suit:
+                beats_lead = RANK_VALUE[card[1:]] > RANK_VALUE[lead_card[1:]]
+            else:
+                beats_lead = trump != "NT" and card[0] == trump
+            if beats_lead:
+                winners.append((1, card))
+        if len(cards) == 1:
+            fixed.append((1, offset + 1, player, cards[0]))
+
+    played_in_first = {card for _, _, _, card in fixed}
+    leaders = {owner[card] for _, card in winners}
+    for t in range(2, 14):
+        for leader in sorted(leaders, key=PLAYERS.index):
+            for offset in range(4):
+                player = PLAYERS[(PLAYERS.index(leader) + offset) % 4]
+                plays.extend((t, offset + 1, player, card) for card in hands[player]
+                             if card not in played_in_first)
+        winners.extend((t, card) for card in owner if card not in played_in_first)
+        leaders = set(PLAYERS)
+
+    return plays, winners, fixed
+
+
+def _tuple_set(name: str, tuples: list) -> list:
+    """OPL tuple set initialisation, eight tuples per line"""
+    items = ["<" + ",".join(f'"{v}"' if isinstance(v, str) else str(v) for v in t) + ">" for t in tuples]
+    rows = ["  " + ", ".join(items[i:i + 8]) for i in range(0, len(items), 8)]
+    return [f"{name} = {{", ",\n".join(rows), "};"]
+
+
+def generate_sparse_opl_dat(data: dict) -> str:
+    """Data for CPLEX/model_sparse.mod: the deal plus the feasible plays"""
+    plays, winners, fixed = feasible_plays(data)
+
+    output = [generate_opl_dat(data), ""]
+    output.append(f"// {len(plays)} feasible plays of {13 * 4 * 4 * 52} in the dense model")
+    output.extend(_tuple_set("PLAYS", plays))
+    output.extend(_tuple_set("WINNERS", winners))
+    output.extend(_tuple_set("FIXED", fixed))
+
+    return "\n".join(output)
+
+
+def main(json_path: str, output_path: str = None, sparse: bool = False) -> str:
     if not os.path.exists(json_path):
         raise FileNotFoundError(f"File '{json_path}' does not exist.")
 
     with open(json_path, "r") as f:
         data = json.load(f)
 
-    opl_dat = generate_opl_dat(data)
+    opl_dat = generate_sparse_opl_dat(data) if sparse else generate_opl_dat(data)
 
     if output_path:
         with open(output_path, "w") as f:
@@ -37,15 +115,125 @@ def main(json_path: str, output_path: str = None) -> str:
     return opl_dat
 
 
+FORMATS = {"dense": generate_opl_dat, "sparse": generate_sparse_opl_dat}
+SUFFIXES = {"dense": ".dat", "sparse": "_sparse.dat"}
+MANIFEST = ".opl_manifest"
+
+
+def read_sources(source: str):
+    """(name, kind, raw bytes) for every deal in a directory of .json files, a .jsonl or a packed .bin"""
+    stem = os.path.splitext(os.path.basename(source.rstrip("/")))[0]
+    if os.path.isdir(source):
+        for deal_file in sorted(os.listdir(source)):
+            if deal_file.endswith(".json"):
+                with open(os.path.join(source, deal_file), "rb") as f:
+                    yield deal_file[:-len(".json")], "json", f.read()
+    elif source.endswith(".bin"):
+        # Imported here so the script still runs on its own from utils/
+        from src.Game_Engine import PACKED_DEAL_SIZE
+        with open(source, "rb") as f:
+            index = 0
+            while record := f.read(PACKED_DEAL_SIZE):
+                yield f"{stem}_{index:06d}", "packed", record
+                index += 1
+    else:
+        with open(source, "rb") as f:
+            for index, line in enumerate(f):
+                if line.strip():
+                    yield f"{stem}_{index:06d}", "json", line
+
+
+def source_hash(raw: bytes, fmt: str) -> str:
+    return hashlib.sha256(fmt.encode() + b"\0" + raw).hexdigest()
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Write via a temporary file in the same directory, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _convert(job: tuple) -> None:
+    kind, raw, outputs = job
+    if kind == "packed":
+        from src.Game_Engine import deal_to_json, unpack_deal
+        data = deal_to_json(*unpack_deal(raw))
+    else:
+        data = json.loads(raw)
+    for fmt, path in outputs:
+        write_atomic(path, FORMATS[fmt](data))
+
+
+def convert_corpus(source: str, out_dir: str, formats: tuple = ("dense", "sparse"),
+                   workers: int = None, force: bool = False) -> dict:
+    """Convert every deal of a source into OPL data files in out_dir, skipping unchanged ones
+
+    A manifest in out_dir records the hash of the source bytes behind each
+    output, so a rerun only converts new or edited deals. The conversions run
+    on a process pool and every file, the manifest included, is written
+    atomically.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs = []
+    updated = {}
+    skipped = 0
+    for name, kind, raw in read_sources(source):
+        outputs = []
+        for fmt in formats:
+            filename = name + SUFFIXES[fmt]
+            digest = source_hash(raw, fmt)
+            path = os.path.join(out_dir, filename)
+            if manifest.get(filename) == digest and os.path.exists(path):
+                skipped += 1
+                continue
+            outputs.append((fmt, path))
+            updated[filename] = digest
+        if outputs:
+            jobs.append((kind, raw, outputs))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Small jobs, so hand them to the workers in chunks
+            for _ in pool.map(_convert, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count())))):
+                pass
+        manifest.update(updated)
+        write_atomic(manifest_path, json.dumps(manifest, sort_keys=True))
+
+    return {"written": len(updated), "skipped": skipped}
+
+
 # Example usage inside code:
 # dat_content = main("deal.json")
 # print(dat_content)
 # Or to save to file:
 # main("deal.json", "deal.dat")
-for deal_file in os.listdir('deals'):
-    if deal_file.endswith('.json'):
-        json_path = os.path.join('deals', deal_file)
-        dat_path = os.path.join('deals', deal_file.replace('.json', '.dat'))
-        main(json_path, dat_path)
-
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert deals to OPL .dat files: a directory of .json deals, a .jsonl or a packed .bin")
+    parser.add_argument("sources", nargs="*", default=["utils/deals"])
+    parser.add_argument("--out", help="output directory (default: the source directory, "
+                                      "or <name>_dat next to a .jsonl/.bin)")
+    parser.add_argument("--format", choices=["dense", "sparse", "both"], default="both")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and convert everything")
+    args = parser.parse_args()
 
+    formats = ("dense", "sparse") if args.format == "both" else (args.format,)
+    for source in args.sources:
+        out_dir = args.out or (source if os.path.isdir(source) else os.path.splitext(source)[0] + "_dat")
+        start = time.perf_counter()
+        counts = convert_corpus(source, out_dir, formats, args.workers, args.force)
+        print(f"{source}: {counts['written']} written, {counts['skipped']} unchanged "
+              f"in {time.perf_counter() - start:.1f} s")
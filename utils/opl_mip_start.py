@@ -0,0 +1,182 @@
+"""MIP start for the CPLEX model built from the GA's best line.
+
+Run from the repository root:
+    python -m utils.opl_mip_start utils/deals/3C.json [--out utils/deals/3C_start.dat]
+                                  [--population 40] [--generations 70]
+
+Writes the deal's OPL data followed by the played line as tuple sets for
+CPLEX/model_mipstart.mod, which hands them to CPLEX as the first incumbent:
+
+    start_x                <trick, position, player, card> with x[t][pos][p][c] = 1
+    start_card_wins        <trick, card> with card_wins_trick[t][c] = 1
+    start_suit_led         <trick, suit> with suit_led[t][s] = 1
+    start_declarer_tricks  tricks t with trick_won_by_declarer[t] = 1
+
+The line comes from the result store when main.py or src.work_queue has
+solved the deal with the same population and generations (and no other
+options), otherwise the GA is run. check_mip_start replays the start
+against the model's constraints, so a broken start is caught without CPLEX.
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+
+from src.Game_Engine import SEATS, determine_trick_winner, parse_card, parse_deal
+from src.simulation import simulate_game
+from src.declarer import genetic_algorithm
+from src.result_store import ResultStore, DEFAULT_STORE_PATH, encode_line, solver_config
+from utils.json_to_opl_dat import generate_opl_dat
+
+
+PARTNER = {"N": "S", "S": "N", "E": "W", "W": "E"}
+
+
+def best_line(data, population_size=40, generations=70, store_path=DEFAULT_STORE_PATH):
+    """Encoded trick_history of the GA's best line, from the result store if possible"""
+    deal = parse_deal(data)
+    # main.py's batch run warm-starts from the genome library, src.work_queue runs the plain GA
+    configs = [solver_config(population_size, generations, warm_start=True),
+               solver_config(population_size, generations)]
+    store = ResultStore(store_path)
+    try:
+        for config in configs:
+            cached = store.get(deal, config)
+            if cached is not None:
+                return cached['line']
+    finally:
+        store.close()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, population_size=population_size, generations=generations)
+    _, _, state = simulate_game(*deal, best)
+    return encode_line(state.trick_history)
+
+
+def mip_start(data, line):
+    """Values of the model variables that are 1 on the given line"""
+    declarer_side = (data['declarer'], PARTNER[data['declarer']])
+    start = {'x': [], 'card_wins_trick': [], 'suit_led': [], 'trick_won_by_declarer': []}
+
+    for trick in line:
+        t = trick['trick_num']
+        players = [player for player, _ in trick['cards']]
+        cards = [parse_card(code) for _, code in trick['cards']]
+        winner = determine_trick_winner(cards, players, data['trump'] == "NT", data['trump'])
+
+        for pos, (player, code) in enumerate(trick['cards'], start=1):
+            start['x'].append((t, pos, player, code))
+        start['card_wins_trick'].append((t, trick['cards'][players.index(winner)][1]))
+        start['suit_led'].append((t, trick['cards'][0][1][0]))
+        if winner in declarer_side:
+            start['trick_won_by_declarer'].append(t)
+
+    return start
+
+
+def check_mip_start(data, start):
+    """Problems with a start for model_mipstart.mod on this deal; empty when consistent"""
+    problems = []
+    owner = {code: player for player, cards in data['hands'].items() for code in cards}
+    declarer_side = (data['declarer'], PARTNER[data['declarer']])
+
+    # Each card once, only by its owner, one card per trick position
+    plays = {}
+    played = set()
+    for t, pos, player, code in start['x']:
+        if owner.get(code) != player:
+            problems.append(f"x[{t}][{pos}][{player}][{code}]: {player} does not hold {code}")
+        if (t, pos) in plays:
+            problems.append(f"trick {t} position {pos} is played twice")
+        if code in played:
+            problems.append(f"{code} is played more than once")
+        plays[(t, pos)] = (player, code)
+        played.add(code)
+    for code in sorted(set(owner) - played):
+        problems.append(f"{code} is never played")
+
+    remaining = {player: set(cards) for player, cards in data['hands'].items()}
+    leader = data['lead']['player']
+    for t in range(1, 14):
+        trick = [plays.get((t, pos)) for pos in range(1, 5)]
+        if None in trick:
+            problems.append(f"trick {t} is incomplete")
+            break
+        players = [player for player, _ in trick]
+        codes = [code for _, code in trick]
+
+        seat = SEATS.index(leader)
+        if players != [SEATS[(seat + i) % 4] for i in range(4)]:
+            problems.append(f"trick {t}: played by {players}, but {leader} is on lead")
+        if t == 1 and trick[0] != (data['lead']['player'], data['lead']['card']):
+            problems.append(f"trick 1 does not start with the opening lead {data['lead']['card']}")
+
+        suit = codes[0][0]
+        led = sorted(s for tt, s in start['suit_led'] if tt == t)
+        if led != [suit]:
+            problems.append(f"trick {t}: suit_led is {led}, the lead is a {suit}")
+        for player, code in trick[1:]:
+            if code[0] != suit and any(c[0] == suit for c in remaining.get(player, ())):
+                problems.append(f"trick {t}: {player} revokes with {code} holding {suit}")
+        for player, code in trick:
+            remaining.get(player, set()).discard(code)
+
+        winner = determine_trick_winner([parse_card(c) for c in codes], players,
+                                        data['trump'] == "NT", data['trump'])
+        wins = sorted(c for tt, c in start['card_wins_trick'] if tt == t)
+        if wins != [codes[players.index(winner)]]:
+            problems.append(f"trick {t}: card_wins_trick is {wins}, {codes[players.index(winner)]} wins")
+        if (t in start['trick_won_by_declarer']) != (winner in declarer_side):
+            problems.append(f"trick {t}: trick_won_by_declarer does not match the winner {winner}")
+        leader = winner
+
+    return problems
+
+
+def format_mip_start(start):
+    """The start as OPL data: tuple sets read by model_mipstart.mod"""
+    x = ", ".join(f'<{t},{pos},"{player}","{code}">' for t, pos, player, code in start['x'])
+    wins = ", ".join(f'<{t},"{code}">' for t, code in start['card_wins_trick'])
+    led = ", ".join(f'<{t},"{suit}">' for t, suit in start['suit_led'])
+    tricks = ", ".join(str(t) for t in start['trick_won_by_declarer'])
+    return "\n".join([
+        "// MIP start: the GA's best line",
+        f"start_x = {{{x}}};",
+        f"start_card_wins = {{{wins}}};",
+        f"start_suit_led = {{{led}}};",
+        f"start_declarer_tricks = {{{tricks}}};",
+    ])
+
+
+def main(json_path, output_path=None, population_size=40, generations=70, store_path=DEFAULT_STORE_PATH):
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    start = mip_start(data, best_line(data, population_size, generations, store_path))
+    problems = check_mip_start(data, start)
+    if problems:
+        raise ValueError("inconsistent MIP start:\n  " + "\n  ".join(problems))
+
+    content = generate_opl_dat(data) + "\n\n" + format_mip_start(start) + "\n"
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(content)
+    return content
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OPL data with a MIP start from the GA's best line")
+    parser.add_argument('deal_file')
+    parser.add_argument('--out', help="write the .dat here instead of printing it")
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--generations', type=int, default=70)
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="result store to take the line from")
+    args = parser.parse_args()
+
+    try:
+        content = main(args.deal_file, args.out, args.population, args.generations, args.store)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    if not args.out:
+        print(content)
@@ -1,43 +1,27 @@
+import argparse
+import json
+import os
+import re
+
 import pandas as pd
 import matplotlib.pyplot as plt
-import io
-
-# Dane dla pierwszej metody (pierwszy CSV)
-data_method1 = """Deal File,Contract,Declarer,Trump,Opening Lead,Declarer Tricks,Result,Over/Under Tricks,Best Fitness,Runtime (s)
-utils/deals\\1D.dat,1D,S,D,KD,6,DOWN,1,-,1.96
-utils/deals\\2C.dat,2C,S,C,QH,8,MADE,0,-,2.08
-utils/deals\\3C.dat,3C,S,C,6D,9,MADE,0,-,1.88
-utils/deals\\4H.dat,4H,S,H,TH,8,DOWN,2,-,1.95
-utils/deals\\4S.dat,4S,S,S,KC,5,DOWN,5,-,1.97
-utils/deals\\5C.dat,5C,S,C,3C,6,DOWN,5,-,1.97
-utils/deals\\5D.dat,5D,S,D,TC,8,DOWN,3,-,1.99
-utils/deals\\6D.dat,6D,S,D,2C,9,DOWN,3,-,1.81
-utils/deals\\6H.dat,6H,S,H,TD,11,DOWN,1,-,1.72
-utils/deals\\7C.dat,7C,S,C,8H,13,MADE,0,-,1.82
-"""
-
-# Dane dla drugiej metody (drugi CSV)
-data_method2 = """Deal File,Contract,Declarer,Trump,Opening Lead,Declarer Tricks,Result,Over/Under Tricks,Best Fitness,Runtime (s)
-utils/deals\\1D.json,1D,S,D,KD,9,MADE,2,178.09,37.30
-utils/deals\\2C.json,2C,S,C,QH,9,MADE,1,174.31,40.65
-utils/deals\\3C.json,3C,S,C,6D,7,DOWN,2,43.04,44.91
-utils/deals\\4H.json,4H,S,H,TH,10,MADE,0,173.46,47.48
-utils/deals\\4S.json,4S,S,S,KC,13,MADE,3,230.80,49.79
-utils/deals\\5C.json,5C,S,C,3C,12,MADE,1,170.36,49.25
-utils/deals\\5D.json,5D,S,D,TC,12,MADE,1,200.27,51.65
-utils/deals\\6D.json,6D,S,D,2C,12,MADE,0,165.86,49.65
-utils/deals\\6H.json,6H,S,H,TD,13,MADE,1,201.17,46.22
-utils/deals\\7C.json,7C,S,C,8H,13,MADE,0,179.90,45.52
-"""
-
-# Wczytaj dane do ramek danych pandas
-df1 = pd.read_csv(io.StringIO(data_method1))
-df2 = pd.read_csv(io.StringIO(data_method2))
-
-# Upewnij się, że kolumna 'Deal File' jest używana jako etykiety dla osi X
-# Możemy uprościć etykiety, biorąc tylko nazwę pliku
-df1['Deal Name'] = df1['Deal File'].apply(lambda x: x.split('\\')[-1].split('.')[0])
-df2['Deal Name'] = df2['Deal File'].apply(lambda x: x.split('\\')[-1].split('.')[0])
+
+# Uruchamiać z katalogu głównego repozytorium:
+#   python -m utils.plot                           (porównanie CPLEX vs GA z plików CSV)
+#   python -m utils.plot --telemetry logs/*.jsonl  (zbieżność i przepustowość GA)
+
+
+# Wczytaj wyniki jednej metody z pliku CSV
+def load_results(path):
+    df = pd.read_csv(path)
+    # Upraszczamy etykiety, biorąc tylko nazwę pliku (ścieżki mogą mieć '\' lub '/')
+    df['Deal Name'] = df['Deal File'].apply(lambda x: re.split(r'[\\/]', x)[-1].split('.')[0])
+    df['Required Tricks'] = df['Contract'].apply(get_required_tricks)
+    # Sortowanie danych według 'Deal Name', aby zapewnić spójność na wykresach
+    # (przy wielokrotnych uruchomieniach bierzemy ostatni wynik dla rozdania)
+    df = df.drop_duplicates(subset='Deal Name', keep='last')
+    return df.sort_values(by='Deal Name').reset_index(drop=True)
+
 
 # Funkcja do wyodrębniania liczby lew potrzebnych do ugrania kontraktu
 def get_required_tricks(contract):
@@ -47,41 +31,94 @@ def get_required_tricks(contract):
     except (ValueError, IndexError):
         return None # Obsługa błędów, jeśli format kontraktu jest nieoczekiwany
 
-# Dodaj kolumnę z wymaganą liczbą lew do obu ramek danych
-df1['Required Tricks'] = df1['Contract'].apply(get_required_tricks)
-df2['Required Tricks'] = df2['Contract'].apply(get_required_tricks)
-
-# Sortowanie danych według 'Deal Name', aby zapewnić spójność na wykresach
-df1 = df1.sort_values(by='Deal Name').reset_index(drop=True)
-df2 = df2.sort_values(by='Deal Name').reset_index(drop=True)
-
-
-# --- Wykres porównujący czasy wykonania (Runtime) ---
-plt.figure(figsize=(12, 6))
-plt.plot(df1['Deal Name'], df1['Runtime (s)'], marker='o', label='CPLEX SOLVER')
-plt.plot(df2['Deal Name'], df2['Runtime (s)'], marker='x', color = 'g',  label='GA SOLVER')
-plt.xlabel('Nazwa Pliku Danych')
-plt.ylabel('Czas wykonania (s)')
-plt.title('Porównanie Czasów Wykonania dla Dwóch Metod')
-plt.xticks(rotation=45, ha='right')
-plt.legend()
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show()
-
-# --- Wykres porównujący liczbę zdobytych lew (Declarer Tricks) ---
-plt.figure(figsize=(12, 6))
-plt.plot(df1['Deal Name'], df1['Declarer Tricks'], marker='o', label='CPLEX SOLVER')
-plt.plot(df2['Deal Name'], df2['Declarer Tricks'], marker='x', color = 'g', label='GA SOLVER')
-
-# Dodajemy punkty z wymaganą liczbą lew
-# Zakładamy, że Required Tricks są takie same dla obu metod dla danego kontraktu
-plt.scatter(df1['Deal Name'], df1['Required Tricks'], color='red', marker='D', s=100, label='Wymagane do kontraktu') # 'D' to symbol diamentu
-plt.xlabel('Nazwa Pliku Danych')
-plt.ylabel('Liczba Zdobytych Lew')
-plt.title('Porównanie Liczby Zdobytych Lew oraz Wymaganych Lew do Kontraktu')
-plt.xticks(rotation=45, ha='right')
-plt.legend()
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+
+# Wczytaj strumień telemetrii GA (jeden rekord JSON na generację)
+def load_telemetry(path):
+    with open(path) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def plot_comparison(df1, df2):
+    # --- Wykres porównujący czasy wykonania (Runtime) ---
+    plt.figure(figsize=(12, 6))
+    plt.plot(df1['Deal Name'], df1['Runtime (s)'], marker='o', label='CPLEX SOLVER')
+    plt.plot(df2['Deal Name'], df2['Runtime (s)'], marker='x', color = 'g',  label='GA SOLVER')
+    plt.xlabel('Nazwa Pliku Danych')
+    plt.ylabel('Czas wykonania (s)')
+    plt.title('Porównanie Czasów Wykonania dla Dwóch Metod')
+    plt.xticks(rotation=45, ha='right')
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+    # --- Wykres porównujący liczbę zdobytych lew (Declarer Tricks) ---
+    plt.figure(figsize=(12, 6))
+    plt.plot(df1['Deal Name'], df1['Declarer Tricks'], marker='o', label='CPLEX SOLVER')
+    plt.plot(df2['Deal Name'], df2['Declarer Tricks'], marker='x', color = 'g', label='GA SOLVER')
+
+    # Dodajemy punkty z wymaganą liczbą lew
+    # Zakładamy, że Required Tricks są takie same dla obu metod dla danego kontraktu
+    plt.scatter(df1['Deal Name'], df1['Required Tricks'], color='red', marker='D', s=100, label='Wymagane do kontraktu') # 'D' to symbol diamentu
+    plt.xlabel('Nazwa Pliku Danych')
+    plt.ylabel('Liczba Zdobytych Lew')
+    plt.title('Porównanie Liczby Zdobytych Lew oraz Wymaganych Lew do Kontraktu')
+    plt.xticks(rotation=45, ha='right')
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_telemetry(paths):
+    runs = {os.path.basename(p).split('.')[0]: load_telemetry(p) for p in paths}
+
+    # --- Zbieżność: najlepsze i średnie przystosowanie oraz pasmo p10-p90 ---
+    fig, (ax_fit, ax_div) = plt.subplots(1, 2, figsize=(14, 6))
+    for name, df in runs.items():
+        line, = ax_fit.plot(df['generation'], df['best'], label=f'{name} (najlepszy)')
+        ax_fit.plot(df['generation'], df['mean'], linestyle='--', color=line.get_color())
+        ax_fit.fill_between(df['generation'], df['p10'], df['p90'], color=line.get_color(), alpha=0.15)
+        ax_div.plot(df['generation'], df['diversity'], color=line.get_color(), label=name)
+    ax_fit.set_xlabel('Generacja')
+    ax_fit.set_ylabel('Przystosowanie')
+    ax_fit.set_title('Zbieżność GA (linia przerywana: średnia, pasmo: p10-p90)')
+    ax_fit.legend()
+    ax_fit.grid(True, linestyle='--', alpha=0.7)
+    ax_div.set_xlabel('Generacja')
+    ax_div.set_ylabel('Średnie odchylenie genów')
+    ax_div.set_title('Różnorodność populacji')
+    ax_div.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+    # --- Przepustowość: ewaluacje na sekundę i przystosowanie względem czasu ---
+    fig, (ax_rate, ax_time) = plt.subplots(1, 2, figsize=(14, 6))
+    for name, df in runs.items():
+        ax_rate.plot(df['generation'], df['evaluations_per_s'], marker='.', label=name)
+        ax_time.plot(df['wall_time'], df['best'], label=name)
+    ax_rate.set_xlabel('Generacja')
+    ax_rate.set_ylabel('Symulacje rozdań na sekundę')
+    ax_rate.set_title('Przepustowość ewaluacji')
+    ax_rate.legend()
+    ax_rate.grid(True, linestyle='--', alpha=0.7)
+    ax_time.set_xlabel('Czas (s)')
+    ax_time.set_ylabel('Najlepsze przystosowanie')
+    ax_time.set_title('Jakość względem czasu obliczeń')
+    ax_time.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wykresy wyników solverów i telemetrii GA")
+    parser.add_argument('--cplex', default='utils/deals/results_cplex.csv')
+    parser.add_argument('--ga', default='utils/deals/results.csv')
+    parser.add_argument('--telemetry', nargs='+', metavar='JSONL',
+                        help="pliki telemetrii z main.py --telemetry")
+    args = parser.parse_args()
+
+    if args.telemetry:
+        plot_telemetry(args.telemetry)
+    else:
+        plot_comparison(load_results(args.cplex), load_results(args.ga))
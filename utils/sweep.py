@@ -0,0 +1,133 @@
+"""Hyperparameter sweep of the GA with successive halving.
+
+Run from the repository root:
+    python -m utils.sweep [--search grid|random] [--samples 27] [--min-generations 10]
+                          [--max-generations 90] [--eta 3] [--workers N]
+
+Every configuration (population size, elite fraction and the two mutation
+rates) is first run on every deal in --deals for --min-generations
+generations. Only the best 1/eta of them are promoted to the next rung, which
+gets eta times as many generations, until --max-generations. Quality is the
+mean score_result of the best strategy over the deals; the leaderboard shows
+it next to the wall time each configuration used.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Game_Engine import load_deal, pack_deal, unpack_deal
+from src.simulation import simulate_game
+from src.declarer import genetic_algorithm, score_result
+
+
+GRID = {
+    'population_size': [20, 40, 60],
+    'elite_fraction': [0.1, 0.2, 0.3],
+    'mutation_rate': [0.05, 0.1, 0.2],
+    'late_mutation_rate': [0.02, 0.05],
+}
+RANGES = {
+    'population_size': (16, 80),
+    'elite_fraction': (0.05, 0.4),
+    'mutation_rate': (0.02, 0.3),
+    'late_mutation_rate': (0.01, 0.1),
+}
+
+
+def grid_configs():
+    return [dict(zip(GRID, values)) for values in itertools.product(*GRID.values())]
+
+
+def random_configs(samples, rng):
+    configs = []
+    for _ in range(samples):
+        low, high = RANGES['population_size']
+        config = {'population_size': rng.randint(low, high)}
+        for name in ('elite_fraction', 'mutation_rate', 'late_mutation_rate'):
+            config[name] = round(rng.uniform(*RANGES[name]), 3)
+        configs.append(config)
+    return configs
+
+
+def _run(packed_deal, config, generations):
+    """Worker side: one GA run, scored by replaying its best strategy"""
+    deal = unpack_deal(packed_deal)
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, generations=generations, **config)
+    made_contract, tricks, _ = simulate_game(*deal, best, record=False)
+    return score_result(made_contract, tricks, deal[3]), tricks, time.perf_counter() - start_time
+
+
+def rungs(min_generations, max_generations, eta):
+    budgets = [min_generations]
+    while budgets[-1] * eta <= max_generations:
+        budgets.append(budgets[-1] * eta)
+    return budgets
+
+
+def successive_halving(deals, configs, min_generations=10, max_generations=90, eta=3, workers=None):
+    """Leaderboard rows, one per configuration, best first"""
+    packed = [pack_deal(*deal) for deal in deals]
+    rows = [{'config': config, 'generations': 0, 'score': None, 'tricks': None, 'wall_time': 0.0}
+            for config in configs]
+    survivors = rows
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for budget in rungs(min_generations, max_generations, eta):
+            jobs = [(row, pool.submit(_run, deal, row['config'], budget)) for row in survivors for deal in packed]
+            results = {id(row): [] for row in survivors}
+            for row, future in jobs:
+                results[id(row)].append(future.result())
+
+            for row in survivors:
+                scores, tricks, times = zip(*results[id(row)])
+                row.update(generations=budget, score=sum(scores) / len(scores),
+                           tricks=sum(tricks) / len(tricks))
+                row['wall_time'] += sum(times)
+
+            survivors.sort(key=lambda r: r['score'], reverse=True)
+            print(f"{budget:4d} generations: {len(survivors)} configurations, "
+                  f"best score {survivors[0]['score']:.1f}")
+            survivors = survivors[:max(1, len(survivors) // eta)]
+
+    # Configurations that got further rank first, then by their last score
+    return sorted(rows, key=lambda r: (r['generations'], r['score']), reverse=True)
+
+
+def print_leaderboard(rows, top=None):
+    print(f"{'Pop':>4s} {'Elite':>6s} {'Mut':>6s} {'Late':>6s} {'Gens':>5s} {'Score':>7s} {'Tricks':>7s} {'Wall (s)':>9s}")
+    print("-" * 58)
+    for row in rows[:top]:
+        config = row['config']
+        print(f"{config['population_size']:4d} {config['elite_fraction']:6.2f} {config['mutation_rate']:6.3f} "
+              f"{config['late_mutation_rate']:6.3f} {row['generations']:5d} {row['score']:7.1f} "
+              f"{row['tricks']:7.2f} {row['wall_time']:9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving sweep of GA hyperparameters")
+    parser.add_argument('--deals', default='utils/deals')
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--samples', type=int, default=27, help="configurations for a random search")
+    parser.add_argument('--min-generations', type=int, default=10)
+    parser.add_argument('--max-generations', type=int, default=90)
+    parser.add_argument('--eta', type=int, default=3, help="keep the best 1/eta at each rung")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=20, help="leaderboard rows to print")
+    args = parser.parse_args()
+
+    files = sorted(f for f in os.listdir(args.deals) if f.endswith('.json'))
+    deals = [load_deal(os.path.join(args.deals, f)) for f in files]
+    configs = grid_configs() if args.search == 'grid' else random_configs(args.samples, random.Random(args.seed))
+
+    print(f"{len(configs)} configurations on {len(deals)} deals\n")
+    rows = successive_halving(deals, configs, args.min_generations, args.max_generations, args.eta, args.workers)
+    print()
+    print_leaderboard(rows, args.top)
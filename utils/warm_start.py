@@ -0,0 +1,72 @@
+"""Compare generations-to-convergence of cold and warm-started GA runs.
+
+Run from the repository root:
+    python -m utils.warm_start [--population 40] [--generations 70]
+
+Every deal in utils/deals is first solved from a random population. Each deal
+is then solved again, seeded from the genomes of the *other* deals
+(leave-one-out), so a deal never warm-starts from its own solution.
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+from src.Game_Engine import load_deal
+from src.declarer import genetic_algorithm
+from src.genome_library import GenomeLibrary
+
+
+def generations_to_converge(history, tolerance=5):
+    """First generation whose best fitness is within tolerance of the run's best"""
+    target = max(history) - tolerance
+    return next(i for i, fitness in enumerate(history) if fitness >= target) + 1
+
+
+def run(deal, population_size, generations, initial_genomes=None):
+    history = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = genetic_algorithm(*deal, population_size=population_size, generations=generations,
+                                 initial_genomes=initial_genomes, history=history)
+    return best, history
+
+
+def main(deals_dir, population_size, generations):
+    deal_files = sorted(f for f in os.listdir(deals_dir) if f.endswith('.json'))
+    deals = {f: load_deal(os.path.join(deals_dir, f)) for f in deal_files}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library = GenomeLibrary(os.path.join(tmp, 'genomes.db'))
+
+        cold = {}
+        for name, deal in deals.items():
+            best, history = run(deal, population_size, generations)
+            library.add(deal, best)
+            cold[name] = history
+
+        print(f"{'Deal':8s} {'Cold gens':>9s} {'Cold best':>9s} {'Warm gens':>9s} {'Warm best':>9s}")
+        totals = [0, 0]
+        for name, deal in deals.items():
+            seeds = library.nearest(deal, k=population_size // 4, exclude_self=True)
+            _, warm = run(deal, population_size, generations, initial_genomes=seeds)
+
+            cold_gens = generations_to_converge(cold[name])
+            warm_gens = generations_to_converge(warm)
+            totals[0] += cold_gens
+            totals[1] += warm_gens
+            print(f"{name[:-5]:8s} {cold_gens:9d} {max(cold[name]):9.1f} {warm_gens:9d} {max(warm):9.1f}")
+
+        library.close()
+
+    print(f"\nMean generations to convergence: cold {totals[0] / len(deals):.1f}, "
+          f"warm {totals[1] / len(deals):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--deals', default='utils/deals')
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--generations', type=int, default=70)
+    args = parser.parse_args()
+    main(args.deals, args.population, args.generations)